@@ -8,26 +8,60 @@ OASIS Agent Profile生成器
 3. 区分个人实体和抽象群体实体
 """
 
+import io
 import json
 import random
 import time
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from openai import OpenAI
 from zep_cloud.client import Zep
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow 为可选依赖，缺失时回退到标准库 csv
+    pa = pa_csv = None
+
 from ..config import Config
+from ..utils.file_io import write_file_atomic
 from ..utils.logger import get_logger
 from .zep_entity_reader import EntityNode, ZepEntityReader
 
 logger = get_logger('echolens.oasis_profile')
 
+# Profile 默认创建日期缓存：(失效时间戳, "YYYY-MM-DD")
+_created_at_cache = (0.0, "")
+
+
+def _default_created_at() -> str:
+    """
+    Profile 默认创建日期（本地日期）
+    
+    同一天内复用已格式化的日期字符串，批量创建 Profile 时不再逐个构造 datetime 并格式化；
+    跨过本地午夜后重新计算，长期运行的服务不会沿用旧日期
+    """
+    global _created_at_cache
+    expires_at, today = _created_at_cache
+    now = time.time()
+    if now >= expires_at:
+        now_dt = datetime.fromtimestamp(now)
+        today = now_dt.strftime("%Y-%m-%d")
+        next_midnight = now_dt.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        _created_at_cache = (next_midnight.timestamp(), today)
+    return today
+
 
-@dataclass
+@dataclass(slots=True)
 class OasisAgentProfile:
-    """OASIS Agent Profile数据结构"""
+    """OASIS Agent Profile数据结构（slots：每个 Agent 一个实例，不为实例分配 __dict__）"""
     # 通用字段
     user_id: int
     user_name: str
@@ -55,7 +89,7 @@ class OasisAgentProfile:
     source_entity_uuid: Optional[str] = None
     source_entity_type: Optional[str] = None
     
-    created_at: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d"))
+    created_at: str = field(default_factory=_default_created_at)
     
     def to_reddit_format(self) -> Dict[str, Any]:
         """转换为Reddit平台格式"""
@@ -139,6 +173,33 @@ class OasisAgentProfile:
         }
 
 
+# OASIS Twitter CSV 表头
+_TWITTER_CSV_HEADERS = ['user_id', 'name', 'username', 'user_char', 'description']
+
+
+def _twitter_csv_columns(profiles: List[OasisAgentProfile]) -> List[list]:
+    """按列整理 OASIS Twitter CSV 数据，顺序与 _TWITTER_CSV_HEADERS 一致"""
+    user_chars = []
+    descriptions = []
+    for profile in profiles:
+        # user_char: 完整人设（bio + persona），用于LLM系统提示
+        user_char = profile.bio
+        if profile.persona and profile.persona != profile.bio:
+            user_char = f"{profile.bio} {profile.persona}"
+        # 处理换行符（CSV中用空格替代）
+        user_chars.append(user_char.replace('\n', ' ').replace('\r', ' '))
+        # description: 简短简介，用于外部显示
+        descriptions.append(profile.bio.replace('\n', ' ').replace('\r', ' '))
+    
+    return [
+        list(range(len(profiles))),                     # user_id: 从0开始的顺序ID
+        [profile.name for profile in profiles],         # name: 真实姓名
+        [profile.user_name for profile in profiles],    # username: 用户名
+        user_chars,                                     # user_char: 完整人设（内部LLM使用）
+        descriptions,                                   # description: 简短简介（外部显示）
+    ]
+
+
 class OasisProfileGenerator:
     """
     OASIS Profile生成器
@@ -177,6 +238,19 @@ class OasisProfileGenerator:
         "mediaoutlet", "company", "institution", "group", "community"
     ]
     
+    # gender 字段到 OASIS 取值（male/female/other）的映射，保存每个 Profile 时查表
+    GENDER_MAP = {
+        # 中文映射
+        "男": "male",
+        "女": "female",
+        "机构": "other",
+        "其他": "other",
+        # 英文已有
+        "male": "male",
+        "female": "female",
+        "other": "other",
+    }
+    
     def __init__(
         self, 
         api_key: Optional[str] = None,
@@ -1062,58 +1136,13 @@ class OasisProfileGenerator:
         else:
             self._save_reddit_json(profiles, file_path)
     
-    def _save_twitter_csv(self, profiles: List[OasisAgentProfile], file_path: str):
-        """
-        保存Twitter Profile为CSV格式（符合OASIS官方要求）
-        
-        OASIS Twitter要求的CSV字段：
-        - user_id: 用户ID（根据CSV顺序从0开始）
-        - name: 用户真实姓名
-        - username: 系统中的用户名
-        - user_char: 详细人设描述（注入到LLM系统提示中，指导Agent行为）
-        - description: 简短的公开简介（显示在用户资料页面）
-        
-        user_char vs description 区别：
-        - user_char: 内部使用，LLM系统提示，决定Agent如何思考和行动
-        - description: 外部显示，其他用户可见的简介
-        """
-        import csv
-        
-        # 确保文件扩展名是.csv
-        if not file_path.endswith('.csv'):
-            file_path = file_path.replace('.json', '.csv')
-        
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # 写入OASIS要求的表头
-            headers = ['user_id', 'name', 'username', 'user_char', 'description']
-            writer.writerow(headers)
-            
-            # 写入数据行
-            for idx, profile in enumerate(profiles):
-                # user_char: 完整人设（bio + persona），用于LLM系统提示
-                user_char = profile.bio
-                if profile.persona and profile.persona != profile.bio:
-                    user_char = f"{profile.bio} {profile.persona}"
-                # 处理换行符（CSV中用空格替代）
-                user_char = user_char.replace('\n', ' ').replace('\r', ' ')
-                
-                # description: 简短简介，用于外部显示
-                description = profile.bio.replace('\n', ' ').replace('\r', ' ')
-                
-                row = [
-                    idx,                    # user_id: 从0开始的顺序ID
-                    profile.name,           # name: 真实姓名
-                    profile.user_name,      # username: 用户名
-                    user_char,              # user_char: 完整人设（内部LLM使用）
-                    description             # description: 简短简介（外部显示）
-                ]
-                writer.writerow(row)
-        
-        logger.info(f"已保存 {len(profiles)} 个Twitter Profile到 {file_path} (OASIS CSV格式)")
+    @staticmethod
+    def _save_twitter_csv(profiles: List[OasisAgentProfile], file_path: str):
+        """保存Twitter Profile为CSV格式（实现见模块级 save_twitter_csv）"""
+        save_twitter_csv(profiles, file_path)
     
-    def _normalize_gender(self, gender: Optional[str]) -> str:
+    @classmethod
+    def _normalize_gender(cls, gender: Optional[str]) -> str:
         """
         标准化gender字段为OASIS要求的英文格式
         
@@ -1122,40 +1151,21 @@ class OasisProfileGenerator:
         if not gender:
             return "other"
         
-        gender_lower = gender.lower().strip()
-        
-        # 中文映射
-        gender_map = {
-            "男": "male",
-            "女": "female",
-            "机构": "other",
-            "其他": "other",
-            # 英文已有
-            "male": "male",
-            "female": "female",
-            "other": "other",
-        }
-        
-        return gender_map.get(gender_lower, "other")
+        return cls.GENDER_MAP.get(gender.lower().strip(), "other")
     
-    def _save_reddit_json(self, profiles: List[OasisAgentProfile], file_path: str):
-        """
-        保存Reddit Profile为JSON格式
-        
-        使用与 to_reddit_format() 一致的格式，确保 OASIS 能正确读取。
-        必须包含 user_id 字段，这是 OASIS agent_graph.get_agent() 匹配的关键！
-        
-        必需字段：
-        - user_id: 用户ID（整数，用于匹配 initial_posts 中的 poster_agent_id）
-        - username: 用户名
-        - name: 显示名称
-        - bio: 简介
-        - persona: 详细人设
-        - age: 年龄（整数）
-        - gender: "male", "female", 或 "other"
-        - mbti: MBTI类型
-        - country: 国家
-        """
+    @classmethod
+    def _save_reddit_json(cls, profiles: List[OasisAgentProfile], file_path: str):
+        """保存Reddit Profile为JSON格式（实现见模块级 save_reddit_json）"""
+        save_reddit_json(profiles, file_path)
+    
+    @classmethod
+    def _save_reddit_jsonl(cls, profiles: List[OasisAgentProfile], file_path: str):
+        """保存Reddit Profile为JSONL格式（实现见模块级 save_reddit_jsonl）"""
+        save_reddit_jsonl(profiles, file_path)
+    
+    @classmethod
+    def _reddit_profile_records(cls, profiles: List[OasisAgentProfile]) -> List[Dict[str, Any]]:
+        """构建 OASIS Reddit Profile 记录列表（缺失的必需字段填入默认值）"""
         data = []
         for idx, profile in enumerate(profiles):
             # 使用与 to_reddit_format() 一致的格式
@@ -1169,7 +1179,7 @@ class OasisProfileGenerator:
                 "created_at": profile.created_at,
                 # OASIS必需字段 - 确保都有默认值
                 "age": profile.age if profile.age else 30,
-                "gender": self._normalize_gender(profile.gender),
+                "gender": cls._normalize_gender(profile.gender),
                 "mbti": profile.mbti if profile.mbti else "ISTJ",
                 "country": profile.country if profile.country else "中国",
             }
@@ -1182,10 +1192,7 @@ class OasisProfileGenerator:
             
             data.append(item)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"已保存 {len(profiles)} 个Reddit Profile到 {file_path} (JSON格式，包含user_id字段)")
+        return data
     
     # 保留旧方法名作为别名，保持向后兼容
     def save_profiles_to_json(
@@ -1198,3 +1205,100 @@ class OasisProfileGenerator:
         logger.warning("save_profiles_to_json已废弃，请使用save_profiles方法")
         self.save_profiles(profiles, file_path, platform)
 
+
+def save_twitter_csv(profiles: List[OasisAgentProfile], file_path: str):
+    """
+    保存Twitter Profile为CSV格式（符合OASIS官方要求）
+    
+    OASIS Twitter要求的CSV字段：
+    - user_id: 用户ID（根据CSV顺序从0开始）
+    - name: 用户真实姓名
+    - username: 系统中的用户名
+    - user_char: 详细人设描述（注入到LLM系统提示中，指导Agent行为）
+    - description: 简短的公开简介（显示在用户资料页面）
+    
+    user_char vs description 区别：
+    - user_char: 内部使用，LLM系统提示，决定Agent如何思考和行动
+    - description: 外部显示，其他用户可见的简介
+    """
+    # 确保文件扩展名是.csv
+    if not file_path.endswith('.csv'):
+        file_path = file_path.replace('.json', '.csv')
+    
+    columns = _twitter_csv_columns(profiles)
+    
+    if pa_csv is not None:
+        # pyarrow 的 C++ 写入器按列批量编码（字符串值统一加引号，pandas 读取结果不变）
+        table = pa.table(
+            [pa.array(columns[0], type=pa.int64())]
+            + [pa.array(column, type=pa.string()) for column in columns[1:]],
+            names=_TWITTER_CSV_HEADERS
+        )
+        # 先写入内存缓冲区，再整份原子写出
+        sink = pa.BufferOutputStream()
+        pa_csv.write_csv(table, sink)
+        write_file_atomic(file_path, sink.getvalue().to_pybytes())
+    else:
+        import csv
+        
+        # 标准库 csv 写入器（C 实现）写入内存缓冲区，再整份原子写出
+        buffer = io.StringIO(newline='')
+        writer = csv.writer(buffer)
+        
+        # 写入OASIS要求的表头和全部数据行
+        writer.writerow(_TWITTER_CSV_HEADERS)
+        writer.writerows(zip(*columns))
+        write_file_atomic(file_path, buffer.getvalue().encode('utf-8'))
+    
+    logger.info(f"已保存 {len(profiles)} 个Twitter Profile到 {file_path} (OASIS CSV格式)")
+
+
+def save_reddit_json(profiles: List[OasisAgentProfile], file_path: str):
+    """
+    保存Reddit Profile为JSON格式
+    
+    使用与 to_reddit_format() 一致的格式，确保 OASIS 能正确读取。
+    必须包含 user_id 字段，这是 OASIS agent_graph.get_agent() 匹配的关键！
+    
+    必需字段：
+    - user_id: 用户ID（整数，用于匹配 initial_posts 中的 poster_agent_id）
+    - username: 用户名
+    - name: 显示名称
+    - bio: 简介
+    - persona: 详细人设
+    - age: 年龄（整数）
+    - gender: "male", "female", 或 "other"
+    - mbti: MBTI类型
+    - country: 国家
+    
+    文件只供程序读取（OASIS 及后端均用 JSON 解析器加载，与空白无关），因此输出紧凑 JSON、不做缩进美化
+    """
+    # orjson 在原生代码中完成序列化，默认即为紧凑格式；整份内容一次原子写出
+    if orjson is not None:
+        payload = orjson.dumps(OasisProfileGenerator._reddit_profile_records(profiles))
+    else:
+        payload = json.dumps(
+            OasisProfileGenerator._reddit_profile_records(profiles), ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+    write_file_atomic(file_path, payload)
+    
+    logger.info(f"已保存 {len(profiles)} 个Reddit Profile到 {file_path} (JSON格式，包含user_id字段)")
+
+
+def save_reddit_jsonl(profiles: List[OasisAgentProfile], file_path: str):
+    """
+    保存Reddit Profile为JSONL格式（每行一个 Profile，字段与 save_reddit_json 相同）
+    
+    OASIS 只读取 JSON 数组，模拟使用的仍是 save_reddit_json 的输出；
+    JSONL 供大批量 Profile 的流式处理和校验使用，读取方逐行解析，不需要一次载入整个文件
+    """
+    records = OasisProfileGenerator._reddit_profile_records(profiles)
+    if orjson is not None:
+        payload = b''.join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in records)
+    else:
+        payload = ''.join(
+            json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n' for item in records
+        ).encode('utf-8')
+    write_file_atomic(file_path, payload)
+    
+    logger.info(f"已保存 {len(profiles)} 个Reddit Profile到 {file_path} (JSONL格式)")
@@ -6,10 +6,15 @@
 1. Flask写入命令到 commands/ 目录
 2. 模拟脚本轮询命令目录，执行命令并写入响应到 responses/ 目录
 3. Flask轮询响应目录获取结果
+
+模拟脚本提供 ipc.sock（UNIX 域套接字）时优先走套接字通道：
+命令与响应以「4 字节小端长度 + JSON」帧在同一连接上收发，无需轮询
 """
 
 import os
 import json
+import socket
+import struct
 import time
 import uuid
 from typing import Dict, Any, Optional, List
@@ -17,10 +22,16 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+from ..utils.file_io import write_file_atomic
 from ..utils.logger import get_logger
 
 logger = get_logger('echolens.simulation_ipc')
 
+IPC_SOCKET_FILE = "ipc.sock"
+
+# 套接字通道帧头：4 字节小端无符号整数，表示后续 JSON 负载的字节数
+_FRAME_HEADER = struct.Struct('<I')
+
 
 class CommandType(str, Enum):
     """命令类型"""
@@ -109,11 +120,55 @@ class SimulationIPCClient:
         self.simulation_dir = simulation_dir
         self.commands_dir = os.path.join(simulation_dir, "ipc_commands")
         self.responses_dir = os.path.join(simulation_dir, "ipc_responses")
+        self.socket_path = os.path.join(simulation_dir, IPC_SOCKET_FILE)
         
         # 确保目录存在
         os.makedirs(self.commands_dir, exist_ok=True)
         os.makedirs(self.responses_dir, exist_ok=True)
     
+    def _connect_socket(self, timeout: float) -> Optional[socket.socket]:
+        """连接模拟脚本的套接字通道，不可用时返回 None"""
+        if not hasattr(socket, 'AF_UNIX') or not os.path.exists(self.socket_path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            logger.warning(f"IPC套接字不可用，回退到文件通道: {e}")
+            return None
+        return sock
+    
+    @staticmethod
+    def _set_remaining_timeout(sock: socket.socket, deadline: float):
+        """按截止时间设置套接字超时（settimeout 只限制单次调用，整个请求的耗时由截止时间约束）"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("等待IPC响应超时")
+        sock.settimeout(remaining)
+    
+    @classmethod
+    def _recv_exactly(cls, sock: socket.socket, size: int, deadline: float) -> bytes:
+        """在截止时间前从套接字读取恰好 size 个字节"""
+        buf = bytearray()
+        while len(buf) < size:
+            cls._set_remaining_timeout(sock, deadline)
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionError("IPC套接字连接已关闭")
+            buf.extend(chunk)
+        return bytes(buf)
+    
+    def _send_via_socket(self, sock: socket.socket, command: IPCCommand, deadline: float) -> IPCResponse:
+        """通过已连接的套接字发送命令，并在截止时间（time.monotonic）前读取响应"""
+        with sock:
+            payload = json.dumps(command.to_dict(), ensure_ascii=False).encode('utf-8')
+            self._set_remaining_timeout(sock, deadline)
+            sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+            (length,) = _FRAME_HEADER.unpack(self._recv_exactly(sock, _FRAME_HEADER.size, deadline))
+            return IPCResponse.from_dict(json.loads(self._recv_exactly(sock, length, deadline)))
+    
     def send_command(
         self,
         command_type: CommandType,
@@ -134,7 +189,7 @@ class SimulationIPCClient:
             IPCResponse
             
         Raises:
-            TimeoutError: 等待响应超时
+            TimeoutError: 等待响应超时，或套接字连接在收到响应前中断
         """
         command_id = str(uuid.uuid4())
         command = IPCCommand(
@@ -143,10 +198,30 @@ class SimulationIPCClient:
             args=args
         )
         
+        # 优先使用套接字通道（连接成功后不再回退，避免命令被重复执行）
+        deadline = time.monotonic() + timeout
+        sock = self._connect_socket(timeout)
+        if sock is not None:
+            logger.info(f"发送IPC命令(socket): {command_type.value}, command_id={command_id}")
+            try:
+                response = self._send_via_socket(sock, command, deadline)
+            except TimeoutError:
+                logger.error(f"等待IPC响应超时: command_id={command_id}")
+                raise TimeoutError(f"等待命令响应超时 ({timeout}秒)")
+            except (ConnectionError, OSError) as e:
+                # 模拟进程关闭或崩溃导致连接中断，与文件通道一样以 TimeoutError 报告给调用方
+                logger.error(f"IPC套接字连接中断: command_id={command_id}, error={e}")
+                raise TimeoutError(f"等待命令响应时连接中断: {e}")
+            logger.info(f"收到IPC响应: command_id={command_id}, status={response.status.value}")
+            return response
+        
         # 写入命令文件
         command_file = os.path.join(self.commands_dir, f"{command_id}.json")
-        with open(command_file, 'w', encoding='utf-8') as f:
-            json.dump(command.to_dict(), f, ensure_ascii=False, indent=2)
+        # 原子写入：模拟脚本监听到文件出现时内容已完整，不会读到写了一半的命令
+        write_file_atomic(
+            command_file,
+            json.dumps(command.to_dict(), ensure_ascii=False, indent=2).encode('utf-8')
+        )
         
         logger.info(f"发送IPC命令: {command_type.value}, command_id={command_id}")
         
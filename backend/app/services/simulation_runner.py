@@ -652,6 +652,18 @@ class SimulationRunner:
                                     # 总体时间取两个平台的最大值
                                     state.simulated_hours = max(state.twitter_simulated_hours, state.reddit_simulated_hours)
                                 
+                                # 连续的空闲轮次合并为一条 idle_span 事件，按区间末轮更新轮次
+                                elif event_type == "idle_span":
+                                    round_num = action_data.get("end_round", 0)
+                                    if platform == "twitter":
+                                        if round_num > state.twitter_current_round:
+                                            state.twitter_current_round = round_num
+                                    elif platform == "reddit":
+                                        if round_num > state.reddit_current_round:
+                                            state.reddit_current_round = round_num
+                                    if round_num > state.current_round:
+                                        state.current_round = round_num
+                                
                                 continue
                             
                             action = AgentAction(
@@ -1092,6 +1104,7 @@ class SimulationRunner:
             "twitter_simulation.db",  # Twitter 平台数据库
             "reddit_simulation.db",   # Reddit 平台数据库
             "env_status.json",        # 环境状态文件
+            "ipc.sock",               # IPC 套接字文件
         ]
         
         # 要删除的目录列表（包含动作日志）
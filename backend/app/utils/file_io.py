@@ -0,0 +1,31 @@
+"""
+文件写入工具
+后端服务与模拟脚本共用的原子写入实现（只依赖标准库）
+"""
+
+import os
+import tempfile
+
+
+def write_file_atomic(file_path: str, data: bytes):
+    """
+    原子写入文件：先写入目标目录下的唯一临时文件，再用 os.replace 替换目标文件
+    
+    读取方只会看到完整的旧文件或完整的新文件，不会读到写了一半的内容；
+    临时文件名由 mkstemp 生成（以 . 开头、.tmp 结尾），同一目标的并发写入方不会互相覆盖临时文件，
+    按扩展名扫描目录的读取方（如命令目录监听）也不会误读临时文件
+    """
+    dir_name, base_name = os.path.split(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{base_name}.", suffix=".tmp", dir=dir_name)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp 创建的文件权限为 0600，恢复为普通文件的 0644，其他进程仍可读取
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -6,11 +6,47 @@ API调用重试机制
 import time
 import random
 import functools
-from typing import Callable, Any, Optional, Type, Tuple
+import threading
+from typing import Callable, Any, Iterator, Optional, Type, Tuple
 from ..utils.logger import get_logger
 
 logger = get_logger('echolens.retry')
 
+# 每个线程独立的随机数生成器，避免多线程并发重试时争用全局 random 状态
+_tls = threading.local()
+
+
+def _rng() -> random.Random:
+    """获取当前线程的随机数生成器（首次调用时创建）"""
+    rng = getattr(_tls, 'rng', None)
+    if rng is None:
+        rng = random.Random()
+        _tls.rng = rng
+    return rng
+
+
+def _retry_plan(
+    max_retries: int,
+    initial_delay: float,
+    max_delay: float,
+    backoff_factor: float,
+    jitter: bool
+) -> Iterator[Tuple[int, Optional[float]]]:
+    """
+    生成重试计划（同步/异步重试共用的状态机）
+    
+    依次产出 (attempt, delay)：delay 为本次尝试失败后、下次重试前的等待秒数，
+    最后一次尝试的 delay 为 None，表示失败后不再重试。
+    """
+    delay = initial_delay
+    for attempt in range(max_retries):
+        current_delay = min(delay, max_delay)
+        if jitter:
+            current_delay = current_delay * (0.5 + _rng().random())
+        yield attempt, current_delay
+        delay *= backoff_factor
+    yield max_retries, None
+
 
 def retry_with_backoff(
     max_retries: int = 3,
@@ -41,37 +77,27 @@ def retry_with_backoff(
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            last_exception = None
-            delay = initial_delay
+            plan = _retry_plan(max_retries, initial_delay, max_delay, backoff_factor, jitter)
             
-            for attempt in range(max_retries + 1):
+            for attempt, current_delay in plan:
                 try:
                     return func(*args, **kwargs)
                     
                 except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_retries:
+                    if current_delay is None:
                         logger.error(f"函数 {func.__name__} 在 {max_retries} 次重试后仍失败: {str(e)}")
                         raise
                     
-                    # 计算延迟
-                    current_delay = min(delay, max_delay)
-                    if jitter:
-                        current_delay = current_delay * (0.5 + random.random())
-                    
+                    # 使用惰性格式化：WARNING 级别被过滤时不会构建消息字符串
                     logger.warning(
-                        f"函数 {func.__name__} 第 {attempt + 1} 次尝试失败: {str(e)}, "
-                        f"{current_delay:.1f}秒后重试..."
+                        "函数 %s 第 %d 次尝试失败: %s, %.1f秒后重试...",
+                        func.__name__, attempt + 1, e, current_delay
                     )
                     
                     if on_retry:
                         on_retry(e, attempt + 1)
                     
                     time.sleep(current_delay)
-                    delay *= backoff_factor
-            
-            raise last_exception
         
         return wrapper
     return decorator
@@ -94,36 +120,26 @@ def retry_with_backoff_async(
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            last_exception = None
-            delay = initial_delay
+            plan = _retry_plan(max_retries, initial_delay, max_delay, backoff_factor, jitter)
             
-            for attempt in range(max_retries + 1):
+            for attempt, current_delay in plan:
                 try:
                     return await func(*args, **kwargs)
                     
                 except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_retries:
+                    if current_delay is None:
                         logger.error(f"异步函数 {func.__name__} 在 {max_retries} 次重试后仍失败: {str(e)}")
                         raise
                     
-                    current_delay = min(delay, max_delay)
-                    if jitter:
-                        current_delay = current_delay * (0.5 + random.random())
-                    
                     logger.warning(
-                        f"异步函数 {func.__name__} 第 {attempt + 1} 次尝试失败: {str(e)}, "
-                        f"{current_delay:.1f}秒后重试..."
+                        "异步函数 %s 第 %d 次尝试失败: %s, %.1f秒后重试...",
+                        func.__name__, attempt + 1, e, current_delay
                     )
                     
                     if on_retry:
                         on_retry(e, attempt + 1)
                     
                     await asyncio.sleep(current_delay)
-                    delay *= backoff_factor
-            
-            raise last_exception
         
         return wrapper
     return decorator
@@ -165,32 +181,25 @@ class RetryableAPIClient:
         Returns:
             函数返回值
         """
-        last_exception = None
-        delay = self.initial_delay
+        plan = _retry_plan(
+            self.max_retries, self.initial_delay, self.max_delay, self.backoff_factor, jitter=True
+        )
         
-        for attempt in range(self.max_retries + 1):
+        for attempt, current_delay in plan:
             try:
                 return func(*args, **kwargs)
                 
             except exceptions as e:
-                last_exception = e
-                
-                if attempt == self.max_retries:
+                if current_delay is None:
                     logger.error(f"API调用在 {self.max_retries} 次重试后仍失败: {str(e)}")
                     raise
                 
-                current_delay = min(delay, self.max_delay)
-                current_delay = current_delay * (0.5 + random.random())
-                
                 logger.warning(
-                    f"API调用第 {attempt + 1} 次尝试失败: {str(e)}, "
-                    f"{current_delay:.1f}秒后重试..."
+                    "API调用第 %d 次尝试失败: %s, %.1f秒后重试...",
+                    attempt + 1, e, current_delay
                 )
                 
                 time.sleep(current_delay)
-                delay *= self.backoff_factor
-        
-        raise last_exception
     
     def call_batch_with_retry(
         self,
@@ -41,7 +41,15 @@ def main():
     port = int(os.environ.get('FLASK_PORT', 5001))
     debug = Config.DEBUG
     
-    # 启动服务
+    # 生产模式：使用 waitress 多线程 WSGI 服务器替代 Werkzeug 开发服务器
+    if os.environ.get('ECHOLENS_PROD', 'False').lower() == 'true':
+        from waitress import serve
+        threads = int(os.environ.get('ECHOLENS_THREADS', 16))
+        print(f"生产模式启动: http://{host}:{port} (waitress, threads={threads})")
+        serve(app, host=host, port=port, threads=threads)
+        return
+    
+    # 启动服务（开发模式）
     app.run(host=host, port=port, debug=debug, threaded=True)
 
 
@@ -15,30 +15,204 @@
 import json
 import os
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import cached_property
+from typing import Dict, Any, List, Optional, Set
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+# 已确认存在的日志目录（进程内缓存，避免重复的 makedirs 系统调用）
+_ready_dirs: Set[str] = set()
+_ready_dirs_lock = threading.Lock()
+
+
+def _ensure_dir_once(dir_path: str):
+    """确保目录存在，同一目录在进程内只创建一次"""
+    if dir_path in _ready_dirs:
+        return
+    with _ready_dirs_lock:
+        if dir_path not in _ready_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            _ready_dirs.add(dir_path)
+
+
+# 按秒缓存的时间戳前缀：(秒, "YYYY-MM-DDTHH:MM:SS")
+_ts_cache = (None, "")
+
+
+def timestamp() -> str:
+    """
+    生成本地时间的 ISO 格式时间戳（微秒精度）
+    
+    同一秒内复用已格式化的日期时间前缀，只拼接微秒部分，
+    避免每条日志都构造 datetime 并调用 isoformat()
+    """
+    global _ts_cache
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = datetime.fromtimestamp(sec).isoformat()
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{ns // 1000:06d}"
+
+
+def _encode_entry(entry: Dict[str, Any]) -> bytes:
+    """将日志条目序列化为一行 UTF-8 编码的 JSON（含换行符）"""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+# 后台写入线程的退出标记
+_SENTINEL = object()
+
+# 写入线程单次合并写入的最大条目数
+_WRITE_BATCH_SIZE = 256
+
+
+def _append_entry(log_path: str, entry: Dict[str, Any]):
+    """以二进制追加模式写入一条日志，避免文本层的编码开销"""
+    with open(log_path, 'ab') as f:
+        f.write(_encode_entry(entry))
+
+
+class _ShardedLogWriter:
+    """
+    分片日志写入器
+    
+    多个平台的动作日志共用一个后台写入线程：每个日志文件（分片）只打开一次，
+    日志调用只负责把序列化好的数据放入队列，由后台线程按文件合并批量写盘。
+    """
+    
+    def __init__(self, name: str = "action-log-writer"):
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue(maxsize=1024)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def write(self, log_path: str, payload: bytes):
+        """把一条已序列化的日志放入写入队列（首次调用时启动后台线程）"""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name=self.name, daemon=True
+                    )
+                    self._thread.start()
+        # 队列满时阻塞，形成背压
+        self._queue.put((log_path, payload))
+    
+    def _run(self):
+        """后台写入线程：持有各分片的文件句柄，把积压的条目合并为一次写入"""
+        handles: Dict[str, Any] = {}
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < _WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                # close() 之后仍可能有条目入队，退出标记不一定是批次的最后一项
+                stop = any(item is _SENTINEL for item in batch)
+                try:
+                    shards: Dict[str, List[bytes]] = {}
+                    for item in batch:
+                        if item is not _SENTINEL:
+                            shards.setdefault(item[0], []).append(item[1])
+                    
+                    for log_path, payloads in shards.items():
+                        f = handles.get(log_path)
+                        if f is None:
+                            f = handles[log_path] = open(log_path, 'ab')
+                        f.writelines(payloads)
+                        f.flush()
+                except Exception:
+                    # 单批写入失败不能让线程退出，否则后续条目无人消费；
+                    # 关闭已打开的句柄，下一批重新打开文件
+                    logger.exception("写入动作日志失败")
+                    for f in handles.values():
+                        try:
+                            f.close()
+                        except OSError:
+                            pass
+                    handles.clear()
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                
+                if stop:
+                    return
+        finally:
+            for f in handles.values():
+                f.close()
+    
+    def flush(self):
+        """
+        等待队列中的日志全部写入文件
+        
+        会阻塞调用线程直到写盘完成，不要在事件循环中调用（后台线程每批写入后都会 flush 文件）
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+    
+    def close(self):
+        """写完剩余日志，关闭文件句柄并停止后台线程"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_SENTINEL)
+            self._thread.join()
+        self._thread = None
 
 
 class PlatformActionLogger:
     """单平台动作日志记录器"""
     
-    def __init__(self, platform: str, base_dir: str):
+    def __init__(self, platform: str, base_dir: str, writer: Optional[_ShardedLogWriter] = None):
         """
         初始化日志记录器
         
         Args:
             platform: 平台名称 (twitter/reddit)
             base_dir: 模拟目录的基础路径
+            writer: 共享的后台写入器（不传则使用独立的写入器）
         """
         self.platform = platform
         self.base_dir = base_dir
         self.log_dir = os.path.join(base_dir, platform)
         self.log_path = os.path.join(self.log_dir, "actions.jsonl")
         self._ensure_dir()
+        
+        self._owns_writer = writer is None
+        self._writer = writer or _ShardedLogWriter(f"action-log-{platform}")
     
     def _ensure_dir(self):
         """确保目录存在"""
-        os.makedirs(self.log_dir, exist_ok=True)
+        _ensure_dir_once(self.log_dir)
+    
+    def _write(self, entry: Dict[str, Any]):
+        """序列化日志条目并交给后台写入器"""
+        self._writer.write(self.log_path, _encode_entry(entry))
+    
+    def flush(self):
+        """等待队列中的日志全部写入文件"""
+        self._writer.flush()
+    
+    def close(self):
+        """写完剩余日志；独立写入器会同时停止后台线程"""
+        if self._owns_writer:
+            self._writer.close()
+        else:
+            self._writer.flush()
     
     def log_action(
         self,
@@ -53,7 +227,7 @@ class PlatformActionLogger:
         """记录一个动作"""
         entry = {
             "round": round_num,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "agent_id": agent_id,
             "agent_name": agent_name,
             "action_type": action_type,
@@ -62,58 +236,96 @@ class PlatformActionLogger:
             "success": success,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._write(entry)
+    
+    def log_actions_batch(self, round_num: int, actions: List[Dict[str, Any]]):
+        """
+        批量记录同一轮的多个动作
+        
+        整批条目序列化后拼接为一个数据块交给后台写入器，一轮只入队、写入一次
+        
+        Args:
+            round_num: 轮次编号
+            actions: 动作列表，每项包含 agent_id、agent_name、action_type，可选 action_args、result、success
+        """
+        if not actions:
+            return
+        payload = b''.join(
+            _encode_entry({
+                "round": round_num,
+                "timestamp": timestamp(),
+                "agent_id": action["agent_id"],
+                "agent_name": action["agent_name"],
+                "action_type": action["action_type"],
+                "action_args": action.get("action_args") or {},
+                "result": action.get("result"),
+                "success": action.get("success", True),
+            })
+            for action in actions
+        )
+        self._writer.write(self.log_path, payload)
     
     def log_round_start(self, round_num: int, simulated_hour: int):
         """记录轮次开始"""
         entry = {
             "round": round_num,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "event_type": "round_start",
             "simulated_hour": simulated_hour,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._write(entry)
     
     def log_round_end(self, round_num: int, actions_count: int):
         """记录轮次结束"""
         entry = {
             "round": round_num,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "event_type": "round_end",
             "actions_count": actions_count,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._write(entry)
+    
+    def log_idle_span(self, start_round: int, end_round: int):
+        """
+        记录一段连续的空闲轮次（没有活跃 Agent 的轮次）
+        
+        空闲轮次不再逐轮写入 round_start/round_end，而是合并为一条记录，
+        区间内每一轮的动作数均视为 0
+        """
+        entry = {
+            "timestamp": timestamp(),
+            "event_type": "idle_span",
+            "start_round": start_round,
+            "end_round": end_round,
+        }
+        
+        self._write(entry)
     
     def log_simulation_start(self, config: Dict[str, Any]):
         """记录模拟开始"""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "event_type": "simulation_start",
             "platform": self.platform,
             "total_rounds": config.get("time_config", {}).get("total_simulation_hours", 72) * 2,
             "agents_count": len(config.get("agent_configs", [])),
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._write(entry)
     
     def log_simulation_end(self, total_rounds: int, total_actions: int):
         """记录模拟结束"""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "event_type": "simulation_end",
             "platform": self.platform,
             "total_rounds": total_rounds,
             "total_actions": total_actions,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._write(entry)
 
 
 class SimulationLogManager:
@@ -122,38 +334,42 @@ class SimulationLogManager:
     统一管理所有日志文件，按平台分离
     """
     
-    def __init__(self, simulation_dir: str):
+    def __init__(self, simulation_dir: str, truncate_main_log: bool = False):
         """
         初始化日志管理器
         
+        主日志在首次写入时才创建（仅用于动作日志时不会打开 simulation.log）
+        
         Args:
             simulation_dir: 模拟目录路径
+            truncate_main_log: 是否清空已有的 simulation.log（默认追加写入）
         """
         self.simulation_dir = simulation_dir
+        self.truncate_main_log = truncate_main_log
         self.twitter_logger: Optional[PlatformActionLogger] = None
         self.reddit_logger: Optional[PlatformActionLogger] = None
-        self._main_logger: Optional[logging.Logger] = None
-        
-        # 设置主日志
-        self._setup_main_logger()
+        self._shared_writer: Optional[_ShardedLogWriter] = None
     
-    def _setup_main_logger(self):
-        """设置主模拟日志"""
+    @cached_property
+    def _main_logger(self) -> logging.Logger:
+        """主模拟日志（首次访问时设置）"""
         log_path = os.path.join(self.simulation_dir, "simulation.log")
         
         # 创建 logger
-        self._main_logger = logging.getLogger(f"simulation.{os.path.basename(self.simulation_dir)}")
-        self._main_logger.setLevel(logging.INFO)
-        self._main_logger.handlers.clear()
+        main_logger = logging.getLogger(f"simulation.{os.path.basename(self.simulation_dir)}")
+        main_logger.setLevel(logging.INFO)
+        main_logger.handlers.clear()
         
         # 文件处理器
-        file_handler = logging.FileHandler(log_path, encoding='utf-8', mode='w')
+        file_handler = logging.FileHandler(
+            log_path, encoding='utf-8', mode='w' if self.truncate_main_log else 'a'
+        )
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(logging.Formatter(
             '%(asctime)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         ))
-        self._main_logger.addHandler(file_handler)
+        main_logger.addHandler(file_handler)
         
         # 控制台处理器
         console_handler = logging.StreamHandler()
@@ -162,26 +378,42 @@ class SimulationLogManager:
             '[%(asctime)s] %(message)s',
             datefmt='%H:%M:%S'
         ))
-        self._main_logger.addHandler(console_handler)
+        main_logger.addHandler(console_handler)
         
-        self._main_logger.propagate = False
+        main_logger.propagate = False
+        return main_logger
+    
+    def get_shared_writer(self) -> _ShardedLogWriter:
+        """获取各平台共用的后台写入器（每个平台仍写入各自的 actions.jsonl）"""
+        if self._shared_writer is None:
+            self._shared_writer = _ShardedLogWriter()
+        return self._shared_writer
     
     def get_twitter_logger(self) -> PlatformActionLogger:
         """获取 Twitter 平台日志记录器"""
         if self.twitter_logger is None:
-            self.twitter_logger = PlatformActionLogger("twitter", self.simulation_dir)
+            self.twitter_logger = PlatformActionLogger(
+                "twitter", self.simulation_dir, self.get_shared_writer()
+            )
         return self.twitter_logger
     
     def get_reddit_logger(self) -> PlatformActionLogger:
         """获取 Reddit 平台日志记录器"""
         if self.reddit_logger is None:
-            self.reddit_logger = PlatformActionLogger("reddit", self.simulation_dir)
+            self.reddit_logger = PlatformActionLogger(
+                "reddit", self.simulation_dir, self.get_shared_writer()
+            )
         return self.reddit_logger
     
+    def close(self):
+        """停止共享写入器，确保剩余动作日志写入文件"""
+        if self._shared_writer is not None:
+            self._shared_writer.close()
+    
     def log(self, message: str, level: str = "info"):
         """记录主日志"""
-        if self._main_logger:
-            getattr(self._main_logger, level.lower(), self._main_logger.info)(message)
+        main_logger = self._main_logger
+        getattr(main_logger, level.lower(), main_logger.info)(message)
     
     def info(self, message: str):
         self.log(message, "info")
@@ -211,7 +443,7 @@ class ActionLogger:
     def _ensure_dir(self):
         log_dir = os.path.dirname(self.log_path)
         if log_dir:
-            os.makedirs(log_dir, exist_ok=True)
+            _ensure_dir_once(log_dir)
     
     def log_action(
         self,
@@ -226,7 +458,7 @@ class ActionLogger:
     ):
         entry = {
             "round": round_num,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "platform": platform,
             "agent_id": agent_id,
             "agent_name": agent_name,
@@ -236,56 +468,51 @@ class ActionLogger:
             "success": success,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        _append_entry(self.log_path, entry)
     
     def log_round_start(self, round_num: int, simulated_hour: int, platform: str):
         entry = {
             "round": round_num,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "platform": platform,
             "event_type": "round_start",
             "simulated_hour": simulated_hour,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        _append_entry(self.log_path, entry)
     
     def log_round_end(self, round_num: int, actions_count: int, platform: str):
         entry = {
             "round": round_num,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "platform": platform,
             "event_type": "round_end",
             "actions_count": actions_count,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        _append_entry(self.log_path, entry)
     
     def log_simulation_start(self, platform: str, config: Dict[str, Any]):
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "platform": platform,
             "event_type": "simulation_start",
             "total_rounds": config.get("time_config", {}).get("total_simulation_hours", 72) * 2,
             "agents_count": len(config.get("agent_configs", [])),
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        _append_entry(self.log_path, entry)
     
     def log_simulation_end(self, platform: str, total_rounds: int, total_actions: int):
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp(),
             "platform": platform,
             "event_type": "simulation_end",
             "total_rounds": total_rounds,
             "total_actions": total_actions,
         }
         
-        with open(self.log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        _append_entry(self.log_path, entry)
 
 
 # 全局日志实例（兼容旧接口）
@@ -0,0 +1,129 @@
+"""
+Agent 激活抽样
+按模拟小时从 simulation_config.json 的 agent_configs 中抽取本轮激活的 Agent，
+单平台脚本（run_twitter_simulation / run_reddit_simulation）与双平台并行脚本共用
+"""
+
+import random
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时使用纯 Python 抽样
+    np = None
+
+
+# 按小时分桶的候选 Agent 索引及时间配置常量：id(config) -> (config, 索引)
+# 配置在整个模拟过程中不变，每个小时的候选列表和倍数只需计算一次
+_hour_index_cache: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+# 某小时候选 Agent 数达到该值时改用 numpy 向量化抽样（Agent 较少时逐个抽样更快）
+_NUMPY_MIN_CANDIDATES = 256
+
+
+def _get_hour_index(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    获取（必要时构建）配置对应的小时索引
+    
+    Returns:
+        {
+            "buckets": hour -> [(agent_id, activity_level), ...]（保持 agent_configs 中的顺序）,
+            "arrays": hour -> (agent_id 数组, activity_level 数组)（仅候选较多的小时，需要 numpy）,
+            "hour_multipliers": hour -> 活跃度倍数（高峰 / 低谷 / 1.0）,
+            "base_min": 每小时激活 Agent 数下限,
+            "base_max": 每小时激活 Agent 数上限,
+        }
+    """
+    cached = _hour_index_cache.get(id(config))
+    if cached is not None and cached[0] is config:
+        return cached[1]
+    
+    time_config = config.get("time_config", {})
+    buckets: Dict[int, List[Tuple[int, float]]] = {hour: [] for hour in range(24)}
+    for cfg in config.get("agent_configs", []):
+        agent_id = cfg.get("agent_id", 0)
+        activity_level = cfg.get("activity_level", 0.5)
+        for hour in set(cfg.get("active_hours", range(8, 23))):
+            if hour in buckets:
+                buckets[hour].append((agent_id, activity_level))
+    
+    # 大桶额外保存 numpy 数组，供向量化抽样使用
+    arrays = {}
+    if np is not None:
+        for hour, bucket in buckets.items():
+            if len(bucket) >= _NUMPY_MIN_CANDIDATES:
+                arrays[hour] = (
+                    np.array([agent_id for agent_id, _ in bucket]),
+                    np.array([activity_level for _, activity_level in bucket], dtype=float),
+                )
+    
+    # 每小时的活跃度倍数在这里一次算好，每轮只需查表
+    peak_hours = frozenset(time_config.get("peak_hours", [9, 10, 11, 14, 15, 20, 21, 22]))
+    off_peak_hours = frozenset(time_config.get("off_peak_hours", [0, 1, 2, 3, 4, 5]))
+    peak_multiplier = time_config.get("peak_activity_multiplier", 1.5)
+    off_peak_multiplier = time_config.get("off_peak_activity_multiplier", 0.3)
+    hour_multipliers = {}
+    for hour in range(24):
+        if hour in peak_hours:
+            hour_multipliers[hour] = peak_multiplier
+        elif hour in off_peak_hours:
+            hour_multipliers[hour] = off_peak_multiplier
+        else:
+            hour_multipliers[hour] = 1.0
+    
+    index = {
+        "buckets": buckets,
+        "arrays": arrays,
+        "hour_multipliers": hour_multipliers,
+        "base_min": time_config.get("agents_per_hour_min", 5),
+        "base_max": time_config.get("agents_per_hour_max", 20),
+    }
+    _hour_index_cache[id(config)] = (config, index)
+    return index
+
+
+def sample_active_agent_ids(
+    config: Dict[str, Any],
+    current_hour: int,
+    rng: random.Random,
+    np_rng: Optional[Any] = None
+) -> List[int]:
+    """
+    根据时间和配置决定本轮激活哪些 Agent
+    
+    Args:
+        config: 模拟配置（simulation_config.json 的内容）
+        current_hour: 当前模拟小时（0-23）
+        rng: 随机数生成器（random.Random 实例或 random 模块）
+        np_rng: numpy 随机数生成器（可选，为 None 时全部使用纯 Python 抽样）
+    
+    Returns:
+        激活的 agent_id 列表
+    """
+    hour_index = _get_hour_index(config)
+    multiplier = hour_index["hour_multipliers"].get(current_hour, 1.0)
+    
+    target_count = int(rng.uniform(hour_index["base_min"], hour_index["base_max"]) * multiplier)
+    
+    bucket_arrays = hour_index["arrays"].get(current_hour) if np_rng is not None else None
+    if bucket_arrays is not None:
+        # 候选较多：一次生成全部随机数并用掩码筛选
+        agent_ids, activity_levels = bucket_arrays
+        candidates = agent_ids[np_rng.random(activity_levels.shape[0]) < activity_levels]
+        return np_rng.choice(
+            candidates,
+            size=min(target_count, candidates.size),
+            replace=False
+        ).tolist() if candidates.size else []
+    
+    # 只遍历当前小时活跃的 Agent（顺序与 agent_configs 一致）
+    candidates = [
+        agent_id
+        for agent_id, activity_level in hour_index["buckets"].get(current_hour, ())
+        if rng.random() < activity_level
+    ]
+    
+    return rng.sample(
+        candidates,
+        min(target_count, len(candidates))
+    ) if candidates else []
@@ -43,13 +43,7 @@ if sys.platform == 'win32':
         sys.stdout.reconfigure(encoding='utf-8', errors='replace')
     if hasattr(sys.stderr, 'reconfigure'):
         sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-    
-    # 强制设置默认编码（影响 open() 函数的默认编码）
-    # 注意：这需要在 Python 启动时就设置，运行时设置可能不生效
-    # 所以我们还需要 monkey-patch 内置的 open 函数
-    import builtins
-    _original_open = builtins.open
-    
+
     def _utf8_open(file, mode='r', buffering=-1, encoding=None, errors=None, 
                    newline=None, closefd=True, opener=None):
         """
@@ -59,22 +53,29 @@ if sys.platform == 'win32':
         # 只对文本模式（非二进制）且未指定编码的情况设置默认编码
         if encoding is None and 'b' not in mode:
             encoding = 'utf-8'
-        return _original_open(file, mode, buffering, encoding, errors, 
-                              newline, closefd, opener)
-    
-    builtins.open = _utf8_open
+        return open(file, mode, buffering, encoding, errors, 
+                    newline, closefd, opener)
 
 import argparse
 import asyncio
 import json
 import logging
+import logging.handlers
 import multiprocessing
+import queue
 import random
 import signal
+import socket
 import sqlite3
+import struct
+import threading
+import time
 import warnings
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 
 # 全局变量：用于信号处理
@@ -107,14 +108,39 @@ class MaxTokensWarningFilter(logging.Filter):
     """过滤掉 camel-ai 关于 max_tokens 的警告（我们故意不设置 max_tokens，让模型自行决定）"""
     
     def filter(self, record):
+        # 只检查 WARNING 记录的原始消息模板，不调用 getMessage()（避免为每条记录格式化参数）
+        if record.levelno != logging.WARNING:
+            return True
+        msg = record.msg
+        if not isinstance(msg, str):
+            return True
         # 过滤掉包含 max_tokens 警告的日志
-        if "max_tokens" in record.getMessage() and "Invalid or missing" in record.getMessage():
-            return False
-        return True
+        return not ("max_tokens" in msg and "Invalid or missing" in msg)
+
+
+_MAX_TOKENS_FILTER = MaxTokensWarningFilter()
+
 
+def install_max_tokens_filter():
+    """
+    把 max_tokens 警告过滤器挂到实际输出该警告的位置
+    
+    日志器上的过滤器只作用于直接在该日志器上创建的记录：camel.models.* 等子日志器传播上来的记录
+    只经过各级处理器的过滤器，不经过父日志器的过滤器。camel-ai 0.2.x 用 logging.warning()
+    直接在根日志器上输出该警告，因此挂在根日志器本身（覆盖之后才按需创建的处理器），
+    并挂在根日志器、camel 日志器的现有处理器和 logging.lastResort 上（覆盖 camel 子日志器的记录）。
+    同一过滤器实例重复添加不会生效两次，可多次调用
+    """
+    logging.getLogger().addFilter(_MAX_TOKENS_FILTER)
+    handlers = logging.getLogger().handlers + logging.getLogger("camel").handlers
+    if logging.lastResort is not None:
+        handlers.append(logging.lastResort)
+    for handler in handlers:
+        handler.addFilter(_MAX_TOKENS_FILTER)
 
-# 在模块加载时立即添加过滤器，确保在 camel 代码执行前生效
-logging.getLogger().addFilter(MaxTokensWarningFilter())
+
+# 在模块加载时立即添加过滤器，确保在 camel 代码执行前生效（导入 camel 后再挂一次，见下方）
+install_max_tokens_filter()
 
 
 def disable_oasis_logging():
@@ -131,6 +157,9 @@ def disable_oasis_logging():
         "table",
     ]
     
+    # 设置级别而不是 logger.disabled：子日志器（每个 agent 各自的日志器）会继承有效级别，
+    # 在 isEnabledFor() 处直接短路，不会创建 LogRecord；
+    # 也不使用 logging.disable()，否则会连同我们自己的模拟日志一起屏蔽
     for logger_name in oasis_loggers:
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.CRITICAL)  # 只记录严重错误
@@ -156,6 +185,25 @@ def init_logging_for_simulation(simulation_dir: str):
 
 
 from action_logger import SimulationLogManager, PlatformActionLogger
+from agent_activity import sample_active_agent_ids
+from app.utils.file_io import write_file_atomic
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时使用纯 Python 抽样
+    np = None
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 为可选依赖，缺失时回退到目录轮询
+    FileSystemEventHandler = object
+    Observer = None
 
 try:
     from camel.models import ModelFactory
@@ -173,6 +221,18 @@ except ImportError as e:
     print("请先安装: pip install oasis-ai camel-ai")
     sys.exit(1)
 
+# camel 导入时会为根日志器配置输出处理器，处理器出现后再挂一次过滤器
+install_max_tokens_filter()
+
+if sys.platform == 'win32':
+    # 不再替换全局 builtins.open（否则进程内每次 open() 都要多一层 Python 调用），
+    # 只在读取 Agent 配置文件的 OASIS 模块命名空间中注入 UTF-8 版本的 open。
+    # 本模块自身的文本读写均已显式指定编码或使用二进制模式
+    for _generator in (generate_twitter_agent_graph, generate_reddit_agent_graph):
+        _module = sys.modules.get(getattr(_generator, '__module__', ''))
+        if _module is not None:
+            _module.open = _utf8_open
+
 
 # Twitter可用动作（不包含INTERVIEW，INTERVIEW只能通过ManualAction手动触发）
 TWITTER_ACTIONS = [
@@ -202,10 +262,126 @@ REDDIT_ACTIONS = [
 ]
 
 
+# IPC 文件只由 Flask 进程读取，默认输出紧凑 JSON；调试时可设置 ECHOLENS_PRETTY_IPC=true 保留缩进
+_PRETTY_IPC = os.environ.get('ECHOLENS_PRETTY_IPC', 'False').lower() == 'true'
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """序列化为 UTF-8 JSON 字节串（IPC 响应、状态文件使用）"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if _PRETTY_IPC:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if _PRETTY_IPC:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data):
+    """解析 JSON（str 或 bytes），解析失败抛出 json.JSONDecodeError"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 # IPC相关常量
 IPC_COMMANDS_DIR = "ipc_commands"
 IPC_RESPONSES_DIR = "ipc_responses"
 ENV_STATUS_FILE = "env_status.json"
+IPC_SOCKET_FILE = "ipc.sock"
+
+# 每次轮询最多取出的命令数（连续的 Interview 命令会合并执行）
+_COMMAND_BATCH_CAP = 16
+
+# 套接字命令通道的帧头：4 字节小端无符号整数，表示后续 JSON 负载的字节数
+_FRAME_HEADER = struct.Struct('<I')
+
+# 模拟数据库查询语句（集中定义，复用同一 SQL 文本以命中 sqlite3 的语句缓存）
+_SQL = {
+    # rowid 单调递增，按 rowid 取最新记录可直接利用 idx_trace_action_user 索引，
+    # 同时避免 created_at 在两个平台上格式不同（整数 / 日期字符串）的问题
+    "interview": """
+        SELECT user_id, info, created_at
+        FROM trace
+        WHERE action = ? AND user_id = ?
+        ORDER BY rowid DESC
+        LIMIT 1
+    """,
+    "new_actions": """
+        SELECT rowid, user_id, action, info
+        FROM trace
+        WHERE rowid > ?
+        ORDER BY rowid ASC
+    """,
+    # 以下为批量查询模板，{placeholders} 由 _select_in 按 ID 数量展开
+    # 作者显示名称直接在 JOIN 中算出（name 优先，其次 user_name），无需再回查 user 表
+    "posts_info": """
+        SELECT p.post_id, p.content, p.user_id, u.agent_id,
+               COALESCE(NULLIF(u.name, ''), u.user_name, '') AS author_display
+        FROM post p
+        LEFT JOIN user u ON p.user_id = u.user_id
+        WHERE p.post_id IN ({placeholders})
+    """,
+    "comments_info": """
+        SELECT c.comment_id, c.content, c.user_id, u.agent_id,
+               COALESCE(NULLIF(u.name, ''), u.user_name, '') AS author_display
+        FROM comment c
+        LEFT JOIN user u ON c.user_id = u.user_id
+        WHERE c.comment_id IN ({placeholders})
+    """,
+    "users_name": "SELECT user_id, agent_id, name, user_name FROM user WHERE user_id IN ({placeholders})",
+    "posts_meta": "SELECT post_id, original_post_id, quote_content FROM post WHERE post_id IN ({placeholders})",
+    "follows": "SELECT follow_id, followee_id FROM follow WHERE follow_id IN ({placeholders})",
+}
+
+# 单条语句的参数数量上限（低于 SQLite 默认的 SQLITE_MAX_VARIABLE_NUMBER=999）
+_SQL_MAX_VARIABLES = 900
+
+# 帖子/评论/用户查询结果缓存：db_path -> sql_key -> {id: row}
+# 这些记录写入后不再变化，agent_names 覆盖在缓存之外处理，因此缓存始终有效
+_LOOKUP_CACHE_SIZE = 8192
+_lookup_caches: Dict[str, Dict[str, OrderedDict]] = {}
+
+# IN 子句占位符数量的档位（最大档等于 _SQL_MAX_VARIABLES）
+_IN_CLAUSE_BUCKETS = (1, 4, 16, 64, 256, _SQL_MAX_VARIABLES)
+
+# 流式读取新动作时每批从游标取出的行数
+_FETCH_ARRAYSIZE = 512
+
+
+def _connect_db(db_path: str) -> sqlite3.Connection:
+    """
+    打开模拟数据库的只读查询连接
+    
+    连接可被多个线程使用（调用方需自行加锁），并设置只影响本连接的读性能参数。
+    不修改 journal_mode：数据库由 OASIS 负责写入，日志模式保持由其决定。
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+    try:
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")
+        conn.execute("PRAGMA mmap_size = 268435456")
+    except sqlite3.Error:
+        pass
+    return conn
+
+
+def _ensure_trace_index(conn: sqlite3.Connection):
+    """
+    为 trace 表建立 (action, user_id) 索引，供 Interview 结果查询使用
+    
+    SQLite 的普通索引隐含 rowid，因此 ORDER BY rowid DESC LIMIT 1 可直接在索引上完成，
+    不再需要全表扫描。post/follow 表按主键查询，无需额外索引。
+    """
+    try:
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trace_action_user ON trace(action, user_id)"
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        # 数据库被 OASIS 占用写锁等情况下跳过，查询仍可正常执行
+        print(f"  创建trace索引失败（不影响查询）: {e}")
 
 class CommandType:
     """命令类型常量"""
@@ -214,6 +390,89 @@ class CommandType:
     CLOSE_ENV = "close_env"
 
 
+# IPC 处理日志（替代 print：使用 %-格式惰性格式化，并由后台线程写到 stdout）
+_ipc_logger = logging.getLogger("echolens.parallel_ipc")
+
+
+def _start_ipc_log_listener() -> logging.handlers.QueueListener:
+    """
+    配置 IPC 日志：记录经队列交给后台线程写到 stdout，事件循环中不再同步写终端
+    
+    Returns:
+        已启动的 QueueListener，关闭时调用 stop() 写完剩余日志
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    _ipc_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    _ipc_logger.setLevel(logging.INFO)
+    _ipc_logger.propagate = False
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+class _CommandFileWatcher(FileSystemEventHandler):
+    """监听命令目录，把新出现的命令文件路径交给 push 加入待处理队列（在 watchdog 线程中回调）"""
+    
+    def __init__(self, push):
+        super().__init__()
+        self.push = push
+    
+    def on_created(self, event):
+        if not event.is_directory and event.src_path.endswith('.json'):
+            self.push(event.src_path)
+    
+    def on_moved(self, event):
+        if not event.is_directory and event.dest_path.endswith('.json'):
+            self.push(event.dest_path)
+
+
+class _InterviewStepBatcher:
+    """
+    把同一时刻提交到同一平台的 Interview 动作合并为一次 env.step
+    
+    env.step 的耗时主要在 LLM 调用上，多个连续到达的 Interview 命令合并执行后，
+    总耗时接近一次 step。同一个 Agent 在一次 step 中只能有一个动作，
+    重复提交的会等上一批完成后进入下一批。
+    """
+    
+    def __init__(self, env):
+        self.env = env
+        self._pending: Dict[Any, Tuple[Any, asyncio.Future]] = {}
+        self._step_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def submit(self, agent, action):
+        """提交一个动作，等待包含它的那次 env.step 完成（step 失败时抛出同样的异常）"""
+        while agent in self._pending:
+            await asyncio.wait([self._pending[agent][1]])
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending[agent] = (action, future)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush())
+        await future
+    
+    async def _flush(self):
+        """依次执行所有待提交的批次；上一批执行期间新提交的动作会合并到下一批"""
+        async with self._step_lock:
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                try:
+                    await self.env.step({agent: action for agent, (action, _) in batch.items()})
+                except Exception as e:
+                    for _, future in batch.values():
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for _, future in batch.values():
+                        if not future.done():
+                            future.set_result(None)
+
+
 class ParallelIPCHandler:
     """
     双平台IPC命令处理器
@@ -238,43 +497,222 @@ class ParallelIPCHandler:
         self.commands_dir = os.path.join(simulation_dir, IPC_COMMANDS_DIR)
         self.responses_dir = os.path.join(simulation_dir, IPC_RESPONSES_DIR)
         self.status_file = os.path.join(simulation_dir, ENV_STATUS_FILE)
+        self._log_listener = _start_ipc_log_listener()
+        
+        # 每个平台复用一个数据库连接（首次查询时建立）
+        self._db_conns: Dict[str, sqlite3.Connection] = {}
+        self._db_lock = threading.Lock()
         
         # 确保目录存在
         os.makedirs(self.commands_dir, exist_ok=True)
         os.makedirs(self.responses_dir, exist_ok=True)
+        
+        # 命令目录监听：有 watchdog 时由文件系统事件推送新命令，否则每次轮询扫描目录
+        # 已在队列中的路径另存一份集合：监听线程与启动时的目录扫描可能推入同一个文件，重复的不再入队
+        self._pending_commands: deque = deque()
+        self._queued_command_files: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._observer = None
+        self._start_command_watcher()
+        
+        # UNIX 域套接字命令通道（POSIX 可用时启用，命令执行完直接在连接上返回响应）
+        self.socket_path = os.path.join(simulation_dir, IPC_SOCKET_FILE)
+        self._socket_server = None
+        self._socket_responses: Dict[str, Optional[Dict[str, Any]]] = {}
+        # 文件通道与套接字通道的命令串行执行，避免同时调用 env.step
+        self._command_lock = asyncio.Lock()
+        self._close_requested = False
+        
+        # 每个平台一个 Interview 合并器（首次使用时创建）
+        self._step_batchers: Dict[str, _InterviewStepBatcher] = {}
+    
+    def _start_command_watcher(self):
+        """启动命令目录监听，并把已存在的命令文件加入待处理队列"""
+        if Observer is None:
+            return
+        try:
+            observer = Observer()
+            observer.schedule(_CommandFileWatcher(self._queue_command_file), self.commands_dir)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            _ipc_logger.warning("  命令目录监听启动失败，回退到轮询模式: %s", e)
+            return
+        self._observer = observer
+        for filepath in self._scan_command_files():
+            self._queue_command_file(filepath)
+    
+    def _queue_command_file(self, filepath: str):
+        """把命令文件加入待处理队列，已在队列中的路径不重复加入（监听线程与事件循环线程都会调用）"""
+        with self._pending_lock:
+            if filepath in self._queued_command_files:
+                return
+            self._queued_command_files.add(filepath)
+            self._pending_commands.append(filepath)
+    
+    def _pop_command_file(self) -> str:
+        """取出队首的命令文件路径"""
+        with self._pending_lock:
+            filepath = self._pending_commands.popleft()
+            self._queued_command_files.discard(filepath)
+        return filepath
+    
+    def _reject_command_file(self, filepath: str, error: Exception):
+        """
+        命令文件无法解析时直接返回失败响应（同时删除命令文件）
+        
+        命令文件由 Flask 端原子写入，读取到的总是完整文件，解析失败说明文件本身有误，重试也不会成功
+        """
+        command_id = os.path.splitext(os.path.basename(filepath))[0]
+        _ipc_logger.warning("  命令文件无法解析，已忽略: %s (%s)", filepath, error)
+        self.send_response(command_id, "failed", error=f"命令文件无法解析: {error}")
+    
+    def _get_conn(self, platform: str) -> Optional[sqlite3.Connection]:
+        """获取指定平台的数据库连接（调用方需持有 self._db_lock）"""
+        conn = self._db_conns.get(platform)
+        if conn is None:
+            db_path = os.path.join(self.simulation_dir, f"{platform}_simulation.db")
+            if not os.path.exists(db_path):
+                return None
+            conn = _connect_db(db_path)
+            _ensure_trace_index(conn)
+            self._db_conns[platform] = conn
+        return conn
+    
+    async def start_socket_server(self):
+        """启动套接字命令通道；平台不支持或启动失败时只使用文件通道"""
+        if not hasattr(socket, 'AF_UNIX'):
+            return
+        try:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self._socket_server = await asyncio.start_unix_server(
+                self._handle_socket_client, path=self.socket_path
+            )
+        except (OSError, NotImplementedError) as e:
+            _ipc_logger.warning("  套接字命令通道启动失败，继续使用文件通道: %s", e)
+    
+    async def _handle_socket_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个套接字连接：读取一帧命令，执行后写回一帧响应"""
+        try:
+            (length,) = _FRAME_HEADER.unpack(await reader.readexactly(_FRAME_HEADER.size))
+            command = _json_loads(await reader.readexactly(length))
+            command_id = command.get("command_id")
+            
+            self._socket_responses[command_id] = None
+            try:
+                await self._dispatch_command(command)
+            finally:
+                response = self._socket_responses.pop(command_id, None)
+            
+            if response is None:
+                response = {
+                    "command_id": command_id,
+                    "status": "failed",
+                    "result": None,
+                    "error": "命令执行失败",
+                    "timestamp": datetime.now().isoformat()
+                }
+            data = _json_dumps(response)
+            writer.write(_FRAME_HEADER.pack(len(data)) + data)
+            await writer.drain()
+        except Exception as e:
+            _ipc_logger.error("  套接字命令处理失败: %s", e)
+        finally:
+            writer.close()
+    
+    def close(self):
+        """停止命令通道（目录监听、套接字），关闭缓存的数据库连接"""
+        if self._socket_server is not None:
+            self._socket_server.close()
+            self._socket_server = None
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+        
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        
+        with self._db_lock:
+            for conn in self._db_conns.values():
+                try:
+                    conn.execute("PRAGMA optimize")
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._db_conns.clear()
+        
+        if self._log_listener is not None:
+            self._log_listener.stop()
+            self._log_listener = None
     
     def update_status(self, status: str):
         """更新环境状态"""
-        with open(self.status_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "status": status,
-                "twitter_available": self.twitter_env is not None,
-                "reddit_available": self.reddit_env is not None,
-                "timestamp": datetime.now().isoformat()
-            }, f, ensure_ascii=False, indent=2)
+        data = _json_dumps({
+            "status": status,
+            "twitter_available": self.twitter_env is not None,
+            "reddit_available": self.reddit_env is not None,
+            "timestamp": datetime.now().isoformat()
+        })
+        write_file_atomic(self.status_file, data)
+    
+    def _scan_command_files(self) -> List[str]:
+        """扫描命令目录，返回按修改时间排序的命令文件路径"""
+        # 单次 scandir：不需要先 exists 再 listdir，也不需要为每个文件 join 路径；
+        # 命令 ID 是 uuid4，文件名不反映先后顺序，因此仍按修改时间排序
+        command_files = []
+        try:
+            with os.scandir(self.commands_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json'):
+                        try:
+                            command_files.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            continue
+        except FileNotFoundError:
+            return []
+        
+        command_files.sort()
+        return [filepath for _, filepath in command_files]
     
     def poll_command(self) -> Optional[Dict[str, Any]]:
         """轮询获取待处理命令"""
-        if not os.path.exists(self.commands_dir):
-            return None
-        
-        # 获取命令文件（按时间排序）
-        command_files = []
-        for filename in os.listdir(self.commands_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.commands_dir, filename)
-                command_files.append((filepath, os.path.getmtime(filepath)))
-        
-        command_files.sort(key=lambda x: x[1])
-        
-        for filepath, _ in command_files:
+        commands = self.poll_commands(1)
+        return commands[0] if commands else None
+    
+    def poll_commands(self, limit: int) -> List[Dict[str, Any]]:
+        """轮询获取最多 limit 条待处理命令（按到达顺序）"""
+        commands = []
+        if self._observer is None:
+            # 轮询模式：按时间顺序读取可解析的命令文件
+            for filepath in self._scan_command_files():
+                if len(commands) >= limit:
+                    break
+                try:
+                    with open(filepath, 'rb') as f:
+                        commands.append(_json_loads(f.read()))
+                except json.JSONDecodeError as e:
+                    self._reject_command_file(filepath, e)
+                except OSError:
+                    continue
+            return commands
+        
+        # 监听模式：只读取事件推送的命令文件，不再扫描整个目录
+        while self._pending_commands and len(commands) < limit:
+            filepath = self._pop_command_file()
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, OSError):
+                with open(filepath, 'rb') as f:
+                    commands.append(_json_loads(f.read()))
+            except json.JSONDecodeError as e:
+                self._reject_command_file(filepath, e)
+            except OSError:
+                # 文件已被处理或删除
                 continue
         
-        return None
+        return commands
     
     def send_response(self, command_id: str, status: str, result: Dict = None, error: str = None):
         """发送响应"""
@@ -286,9 +724,15 @@ class ParallelIPCHandler:
             "timestamp": datetime.now().isoformat()
         }
         
+        # 通过套接字收到的命令，响应由连接处理协程直接写回
+        if command_id in self._socket_responses:
+            self._socket_responses[command_id] = response
+            return
+        
+        # 先完成序列化，再原子写入响应文件
+        data = _json_dumps(response)
         response_file = os.path.join(self.responses_dir, f"{command_id}.json")
-        with open(response_file, 'w', encoding='utf-8') as f:
-            json.dump(response, f, ensure_ascii=False, indent=2)
+        write_file_atomic(response_file, data)
         
         # 删除命令文件
         command_file = os.path.join(self.commands_dir, f"{command_id}.json")
@@ -314,6 +758,13 @@ class ParallelIPCHandler:
         else:
             return None, None, None
     
+    def _get_step_batcher(self, platform: str, env) -> _InterviewStepBatcher:
+        """获取指定平台的 Interview 合并器"""
+        batcher = self._step_batchers.get(platform)
+        if batcher is None:
+            batcher = self._step_batchers[platform] = _InterviewStepBatcher(env)
+        return batcher
+    
     async def _interview_single_platform(self, agent_id: int, prompt: str, platform: str) -> Dict[str, Any]:
         """
         在单个平台上执行Interview
@@ -332,10 +783,11 @@ class ParallelIPCHandler:
                 action_type=ActionType.INTERVIEW,
                 action_args={"prompt": prompt}
             )
-            actions = {agent: interview_action}
-            await env.step(actions)
+            # 同时到达的其他 Interview 会与本次合并为一次 env.step
+            await self._get_step_batcher(actual_platform, env).submit(agent, interview_action)
             
-            result = self._get_interview_result(agent_id, actual_platform)
+            # SQLite 读取放到工作线程执行，避免阻塞事件循环
+            result = await asyncio.to_thread(self._get_interview_result, agent_id, actual_platform)
             result["platform"] = actual_platform
             return result
             
@@ -364,11 +816,11 @@ class ParallelIPCHandler:
             
             if "error" in result:
                 self.send_response(command_id, "failed", error=result["error"])
-                print(f"  Interview失败: agent_id={agent_id}, platform={platform}, error={result['error']}")
+                _ipc_logger.warning("  Interview失败: agent_id=%s, platform=%s, error=%s", agent_id, platform, result['error'])
                 return False
             else:
                 self.send_response(command_id, "completed", result=result)
-                print(f"  Interview完成: agent_id={agent_id}, platform={platform}")
+                _ipc_logger.info("  Interview完成: agent_id=%s, platform=%s", agent_id, platform)
                 return True
         
         # 未指定平台：同时采访两个平台
@@ -405,12 +857,12 @@ class ParallelIPCHandler:
         
         if success_count > 0:
             self.send_response(command_id, "completed", result=results)
-            print(f"  Interview完成: agent_id={agent_id}, 成功平台数={success_count}/{len(platforms_to_interview)}")
+            _ipc_logger.info("  Interview完成: agent_id=%s, 成功平台数=%d/%d", agent_id, success_count, len(platforms_to_interview))
             return True
         else:
             errors = [f"{p}: {r.get('error', '未知错误')}" for p, r in results["platforms"].items()]
             self.send_response(command_id, "failed", error="; ".join(errors))
-            print(f"  Interview失败: agent_id={agent_id}, 所有平台都失败")
+            _ipc_logger.warning("  Interview失败: agent_id=%s, 所有平台都失败", agent_id)
             return False
     
     async def handle_batch_interview(self, command_id: str, interviews: List[Dict], platform: str = None) -> bool:
@@ -447,113 +899,114 @@ class ParallelIPCHandler:
             if self.reddit_env:
                 reddit_interviews.extend(both_platforms_interviews)
         
-        results = {}
-        
-        # 处理Twitter平台的采访
+        # 两个平台的环境相互独立，并发执行 env.step（耗时主要在 LLM 调用上）
+        tasks = []
         if twitter_interviews and self.twitter_env:
-            try:
-                twitter_actions = {}
-                for interview in twitter_interviews:
-                    agent_id = interview.get("agent_id")
-                    prompt = interview.get("prompt", "")
-                    try:
-                        agent = self.twitter_agent_graph.get_agent(agent_id)
-                        twitter_actions[agent] = ManualAction(
-                            action_type=ActionType.INTERVIEW,
-                            action_args={"prompt": prompt}
-                        )
-                    except Exception as e:
-                        print(f"  警告: 无法获取Twitter Agent {agent_id}: {e}")
-                
-                if twitter_actions:
-                    await self.twitter_env.step(twitter_actions)
-                    
-                    for interview in twitter_interviews:
-                        agent_id = interview.get("agent_id")
-                        result = self._get_interview_result(agent_id, "twitter")
-                        result["platform"] = "twitter"
-                        results[f"twitter_{agent_id}"] = result
-            except Exception as e:
-                print(f"  Twitter批量Interview失败: {e}")
-        
-        # 处理Reddit平台的采访
+            tasks.append(self._run_platform_batch_interview(
+                self.twitter_env, self.twitter_agent_graph, twitter_interviews, "twitter", "Twitter"
+            ))
         if reddit_interviews and self.reddit_env:
-            try:
-                reddit_actions = {}
-                for interview in reddit_interviews:
-                    agent_id = interview.get("agent_id")
-                    prompt = interview.get("prompt", "")
-                    try:
-                        agent = self.reddit_agent_graph.get_agent(agent_id)
-                        reddit_actions[agent] = ManualAction(
-                            action_type=ActionType.INTERVIEW,
-                            action_args={"prompt": prompt}
-                        )
-                    except Exception as e:
-                        print(f"  警告: 无法获取Reddit Agent {agent_id}: {e}")
-                
-                if reddit_actions:
-                    await self.reddit_env.step(reddit_actions)
-                    
-                    for interview in reddit_interviews:
-                        agent_id = interview.get("agent_id")
-                        result = self._get_interview_result(agent_id, "reddit")
-                        result["platform"] = "reddit"
-                        results[f"reddit_{agent_id}"] = result
-            except Exception as e:
-                print(f"  Reddit批量Interview失败: {e}")
+            tasks.append(self._run_platform_batch_interview(
+                self.reddit_env, self.reddit_agent_graph, reddit_interviews, "reddit", "Reddit"
+            ))
+        
+        results = {}
+        for platform_results in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(platform_results, BaseException):
+                _ipc_logger.warning("  批量Interview失败: %s", platform_results)
+                continue
+            results.update(platform_results)
         
         if results:
             self.send_response(command_id, "completed", result={
                 "interviews_count": len(results),
                 "results": results
             })
-            print(f"  批量Interview完成: {len(results)} 个Agent")
+            _ipc_logger.info("  批量Interview完成: %d 个Agent", len(results))
             return True
         else:
             self.send_response(command_id, "failed", error="没有成功的采访")
             return False
     
+    async def _run_platform_batch_interview(
+        self,
+        env,
+        agent_graph,
+        interviews: List[Dict],
+        platform_name: str,
+        label: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        在单个平台上执行批量采访
+        
+        Args:
+            env: 平台环境
+            agent_graph: 平台的Agent图
+            interviews: 该平台需要执行的采访列表
+            platform_name: 平台名称（"twitter" / "reddit"）
+            label: 日志中显示的平台名称
+            
+        Returns:
+            {"<platform>_<agent_id>": result} 形式的采访结果
+        """
+        results = {}
+        try:
+            actions = {}
+            for interview in interviews:
+                agent_id = interview.get("agent_id")
+                prompt = interview.get("prompt", "")
+                try:
+                    agent = agent_graph.get_agent(agent_id)
+                    actions[agent] = ManualAction(
+                        action_type=ActionType.INTERVIEW,
+                        action_args={"prompt": prompt}
+                    )
+                except Exception as e:
+                    _ipc_logger.warning("  警告: 无法获取%s Agent %s: %s", label, agent_id, e)
+            
+            if actions:
+                await env.step(actions)
+                
+                for interview in interviews:
+                    agent_id = interview.get("agent_id")
+                    result = await asyncio.to_thread(self._get_interview_result, agent_id, platform_name)
+                    result["platform"] = platform_name
+                    results[f"{platform_name}_{agent_id}"] = result
+        except Exception as e:
+            _ipc_logger.warning("  %s批量Interview失败: %s", label, e)
+        
+        return results
+    
     def _get_interview_result(self, agent_id: int, platform: str) -> Dict[str, Any]:
         """从数据库获取最新的Interview结果"""
-        db_path = os.path.join(self.simulation_dir, f"{platform}_simulation.db")
-        
         result = {
             "agent_id": agent_id,
             "response": None,
             "timestamp": None
         }
         
-        if not os.path.exists(db_path):
-            return result
-        
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # 查询最新的Interview记录
-            cursor.execute("""
-                SELECT user_id, info, created_at
-                FROM trace
-                WHERE action = ? AND user_id = ?
-                ORDER BY created_at DESC
-                LIMIT 1
-            """, (ActionType.INTERVIEW.value, agent_id))
+            with self._db_lock:
+                conn = self._get_conn(platform)
+                if conn is None:
+                    return result
+                
+                # 查询最新的Interview记录
+                row = conn.execute(
+                    _SQL["interview"], (_INTERVIEW_ACTION, agent_id)
+                ).fetchone()
             
-            row = cursor.fetchone()
             if row:
                 user_id, info_json, created_at = row
                 try:
-                    info = json.loads(info_json) if info_json else {}
+                    info = _json_loads(info_json) if info_json else {}
                     result["response"] = info.get("response", info)
                     result["timestamp"] = created_at
                 except json.JSONDecodeError:
                     result["response"] = info_json
             
-            conn.close()
-            
         except Exception as e:
-            print(f"  读取Interview结果失败: {e}")
+            _ipc_logger.warning("  读取Interview结果失败: %s", e)
         
         return result
     
@@ -564,15 +1017,48 @@ class ParallelIPCHandler:
         Returns:
             True 表示继续运行，False 表示应该退出
         """
-        command = self.poll_command()
-        if not command:
-            return True
+        if self._close_requested:
+            return False
         
+        commands = self.poll_commands(_COMMAND_BATCH_CAP)
+        i = 0
+        while i < len(commands):
+            # 连续的单个 Interview 命令并发执行，同平台的 env.step 由合并器合并为一次
+            j = i
+            while j < len(commands) and commands[j].get("command_type") == CommandType.INTERVIEW:
+                j += 1
+            if j - i > 1:
+                async with self._command_lock:
+                    await asyncio.gather(*(self._execute_command(c) for c in commands[i:j]))
+                i = j
+                continue
+            
+            if not await self._dispatch_command(commands[i]):
+                return False
+            i += 1
+        
+        return True
+    
+    async def _dispatch_command(self, command: Dict[str, Any]) -> bool:
+        """
+        执行一条命令（文件通道和套接字通道共用）
+        
+        Returns:
+            True 表示继续运行，False 表示应该退出
+        """
+        async with self._command_lock:
+            should_continue = await self._execute_command(command)
+        if not should_continue:
+            self._close_requested = True
+        return should_continue
+    
+    async def _execute_command(self, command: Dict[str, Any]) -> bool:
+        """根据命令类型调用对应的处理函数"""
         command_id = command.get("command_id")
         command_type = command.get("command_type")
         args = command.get("args", {})
         
-        print(f"\n收到IPC命令: {command_type}, id={command_id}")
+        _ipc_logger.info("\n收到IPC命令: %s, id=%s", command_type, command_id)
         
         if command_type == CommandType.INTERVIEW:
             await self.handle_interview(
@@ -592,7 +1078,7 @@ class ParallelIPCHandler:
             return True
             
         elif command_type == CommandType.CLOSE_ENV:
-            print("收到关闭环境命令")
+            _ipc_logger.info("收到关闭环境命令")
             self.send_response(command_id, "completed", result={"message": "环境即将关闭"})
             return False
         
@@ -603,12 +1089,24 @@ class ParallelIPCHandler:
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """加载配置文件"""
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(config_path, 'rb') as f:
+        return _json_loads(f.read())
 
 
 # 需要过滤掉的非核心动作类型（这些动作对分析价值较低）
-FILTERED_ACTIONS = {'refresh', 'sign_up'}
+FILTERED_ACTIONS = frozenset(('refresh', 'sign_up'))
+
+# LLMAction 不携带任何状态（只标记"由 LLM 自行决定动作"），所有 Agent 共用一个实例
+_LLM_ACTION = LLMAction()
+
+# trace 表中 Interview 动作的 action 值（枚举 .value 是属性访问，模块加载时取一次）
+_INTERVIEW_ACTION = ActionType.INTERVIEW.value
+
+# 写入动作日志时从 action_args 中保留的关键字段
+_ARG_KEYS = (
+    'content', 'post_id', 'comment_id', 'quoted_id', 'new_post_id',
+    'follow_id', 'query', 'like_id', 'dislike_id',
+)
 
 # 动作类型映射表（数据库中的名称 -> 标准名称）
 ACTION_TYPE_MAP = {
@@ -657,7 +1155,8 @@ def get_agent_names_from_config(config: Dict[str, Any]) -> Dict[int, str]:
 def fetch_new_actions_from_db(
     db_path: str,
     last_rowid: int,
-    agent_names: Dict[int, str]
+    agent_names: Dict[int, str],
+    conn: Optional[sqlite3.Connection] = None
 ) -> Tuple[List[Dict[str, Any]], int]:
     """
     从数据库中获取新的动作记录，并补充完整的上下文信息
@@ -666,6 +1165,7 @@ def fetch_new_actions_from_db(
         db_path: 数据库文件路径
         last_rowid: 上次读取的最大 rowid 值（使用 rowid 而不是 created_at，因为不同平台的 created_at 格式不同）
         agent_names: agent_id -> agent_name 映射
+        conn: 可复用的数据库连接（可选，不传则临时打开并在结束后关闭）
         
     Returns:
         (actions_list, new_last_rowid)
@@ -675,310 +1175,356 @@ def fetch_new_actions_from_db(
     actions = []
     new_last_rowid = last_rowid
     
-    if not os.path.exists(db_path):
-        return actions, new_last_rowid
+    owns_conn = conn is None
+    if owns_conn:
+        if not os.path.exists(db_path):
+            return actions, new_last_rowid
+        conn = _connect_db(db_path)
     
     try:
-        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
         # 使用 rowid 来追踪已处理的记录（rowid 是 SQLite 的内置自增字段）
         # 这样可以避免 created_at 格式差异问题（Twitter 用整数，Reddit 用日期时间字符串）
-        cursor.execute("""
-            SELECT rowid, user_id, action, info
-            FROM trace
-            WHERE rowid > ?
-            ORDER BY rowid ASC
-        """, (last_rowid,))
-        
-        for rowid, user_id, action, info_json in cursor.fetchall():
-            # 更新最大 rowid
-            new_last_rowid = rowid
-            
-            # 过滤非核心动作
-            if action in FILTERED_ACTIONS:
-                continue
-            
-            # 解析动作参数
-            try:
-                action_args = json.loads(info_json) if info_json else {}
-            except json.JSONDecodeError:
-                action_args = {}
-            
-            # 精简 action_args，只保留关键字段（保留完整内容，不截断）
-            simplified_args = {}
-            if 'content' in action_args:
-                simplified_args['content'] = action_args['content']
-            if 'post_id' in action_args:
-                simplified_args['post_id'] = action_args['post_id']
-            if 'comment_id' in action_args:
-                simplified_args['comment_id'] = action_args['comment_id']
-            if 'quoted_id' in action_args:
-                simplified_args['quoted_id'] = action_args['quoted_id']
-            if 'new_post_id' in action_args:
-                simplified_args['new_post_id'] = action_args['new_post_id']
-            if 'follow_id' in action_args:
-                simplified_args['follow_id'] = action_args['follow_id']
-            if 'query' in action_args:
-                simplified_args['query'] = action_args['query']
-            if 'like_id' in action_args:
-                simplified_args['like_id'] = action_args['like_id']
-            if 'dislike_id' in action_args:
-                simplified_args['dislike_id'] = action_args['dislike_id']
-            
-            # 转换动作类型名称
-            action_type = ACTION_TYPE_MAP.get(action, action.upper())
-            
-            # 补充上下文信息（帖子内容、用户名等）
-            _enrich_action_context(cursor, action_type, simplified_args, agent_names)
-            
-            actions.append({
-                'agent_id': user_id,
-                'agent_name': agent_names.get(user_id, f'Agent_{user_id}'),
-                'action_type': action_type,
-                'action_args': simplified_args,
-            })
-        
-        conn.close()
+        cursor.execute(_SQL["new_actions"], (last_rowid,))
+        
+        # 分批流式读取，避免 fetchall() 为大量新记录一次性构建完整的中间列表
+        cursor.arraysize = _FETCH_ARRAYSIZE
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for rowid, user_id, action, info_json in rows:
+                # 更新最大 rowid
+                new_last_rowid = rowid
+                
+                # 过滤非核心动作
+                if action in FILTERED_ACTIONS:
+                    continue
+                
+                # 解析动作参数
+                try:
+                    action_args = _json_loads(info_json) if info_json else {}
+                except json.JSONDecodeError:
+                    action_args = {}
+                
+                # 精简 action_args，只保留关键字段（保留完整内容，不截断）
+                simplified_args = {k: action_args[k] for k in _ARG_KEYS if k in action_args}
+                
+                # 转换动作类型名称
+                # 仅在映射表未命中时才计算 upper()，避免每行都构造默认值字符串
+                action_type = ACTION_TYPE_MAP.get(action) or action.upper()
+                
+                actions.append({
+                    'agent_id': user_id,
+                    'agent_name': agent_names.get(user_id, f'Agent_{user_id}'),
+                    'action_type': action_type,
+                    'action_args': simplified_args,
+                })
+        
+        # 批量补充上下文信息（帖子内容、用户名等）
+        _enrich_actions_context(cursor, actions, agent_names, _get_lookup_cache(db_path))
     except Exception as e:
         print(f"读取数据库动作失败: {e}")
+    finally:
+        if owns_conn:
+            conn.close()
     
     return actions, new_last_rowid
 
 
-def _enrich_action_context(
+def _select_in(cursor, sql_key: str, ids) -> List[tuple]:
+    """
+    执行 `WHERE id IN (...)` 形式的批量查询
+    
+    按 _SQL_MAX_VARIABLES 分块，避免超过 SQLite 的参数数量上限
+    """
+    ids = list(ids)
+    rows = []
+    for start in range(0, len(ids), _SQL_MAX_VARIABLES):
+        chunk = ids[start:start + _SQL_MAX_VARIABLES]
+        # 参数个数向上取整到固定档位，多出的位置用 NULL 填充（IN 中的 NULL 不会匹配任何行），
+        # 这样每个档位的 SQL 文本固定，可以命中 sqlite3 的预编译语句缓存
+        slots = next(n for n in _IN_CLAUSE_BUCKETS if n >= len(chunk))
+        cursor.execute(_in_clause_sql(sql_key, slots), chunk + [None] * (slots - len(chunk)))
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+@lru_cache(maxsize=64)
+def _in_clause_sql(sql_key: str, slots: int) -> str:
+    """生成（并缓存）带 slots 个占位符的 IN 查询语句"""
+    return _SQL[sql_key].format(placeholders=", ".join("?" * slots))
+
+
+def _get_lookup_cache(db_path: str) -> Dict[str, OrderedDict]:
+    """获取指定数据库的查询结果缓存（sql_key -> {id: row}）"""
+    return _lookup_caches.setdefault(db_path, {})
+
+
+def _clear_lookup_cache(db_path: str):
+    """丢弃指定数据库的查询结果缓存（数据库重建或模拟结束时调用）"""
+    _lookup_caches.pop(db_path, None)
+
+
+def _select_in_cached(cursor, sql_key: str, ids, cache: Optional[Dict[str, OrderedDict]]) -> List[tuple]:
+    """
+    带缓存的 _select_in：已查询过的 ID 直接返回缓存行，只查询未命中的 ID
+    
+    仅用于写入后不再变化的记录（帖子、评论内容及用户名称），行的第一列必须是查询 ID。
+    每类查询按 LRU 保留最多 _LOOKUP_CACHE_SIZE 行。
+    """
+    if cache is None:
+        return _select_in(cursor, sql_key, ids)
+    
+    rows_cache = cache.setdefault(sql_key, OrderedDict())
+    rows = []
+    missing = []
+    for row_id in ids:
+        row = rows_cache.get(row_id)
+        if row is None:
+            missing.append(row_id)
+        else:
+            rows_cache.move_to_end(row_id)
+            rows.append(row)
+    
+    for row in _select_in(cursor, sql_key, missing):
+        rows_cache[row[0]] = row
+        rows.append(row)
+    
+    while len(rows_cache) > _LOOKUP_CACHE_SIZE:
+        rows_cache.popitem(last=False)
+    return rows
+
+
+def _enrich_actions_context(
     cursor,
-    action_type: str,
-    action_args: Dict[str, Any],
-    agent_names: Dict[int, str]
+    actions: List[Dict[str, Any]],
+    agent_names: Dict[int, str],
+    cache: Optional[Dict[str, OrderedDict]] = None
 ) -> None:
     """
-    为动作补充上下文信息（帖子内容、用户名等）
+    批量为动作补充上下文信息（帖子内容、用户名等）
+    
+    先收集本批动作引用的帖子/评论/关注/用户 ID，每类只发起一次批量查询，
+    再把查询结果回填到各动作中，避免逐条动作查询数据库（N+1 查询）。
     
     Args:
         cursor: 数据库游标
-        action_type: 动作类型
-        action_args: 动作参数（会被修改）
+        actions: 动作列表，每项包含 action_type 和 action_args（action_args 会被修改）
         agent_names: agent_id -> agent_name 映射
+        cache: 查询结果缓存（可选，见 _get_lookup_cache）
     """
     try:
-        # 点赞/踩帖子：补充帖子内容和作者
-        if action_type in ('LIKE_POST', 'DISLIKE_POST'):
-            post_id = action_args.get('post_id')
-            if post_id:
-                post_info = _get_post_info(cursor, post_id, agent_names)
+        post_ids = set()
+        meta_post_ids = set()  # 需要读取 original_post_id / quote_content 的新帖子
+        follow_ids = set()
+        user_ids = set()
+        comment_ids = set()
+        
+        # 第一遍：收集需要查询的 ID
+        for action in actions:
+            action_type = action['action_type']
+            args = action['action_args']
+            
+            if action_type in ('LIKE_POST', 'DISLIKE_POST', 'CREATE_COMMENT'):
+                if args.get('post_id'):
+                    post_ids.add(args['post_id'])
+            elif action_type == 'REPOST':
+                if args.get('new_post_id'):
+                    meta_post_ids.add(args['new_post_id'])
+            elif action_type == 'QUOTE_POST':
+                if args.get('quoted_id'):
+                    post_ids.add(args['quoted_id'])
+                if args.get('new_post_id'):
+                    meta_post_ids.add(args['new_post_id'])
+            elif action_type == 'FOLLOW':
+                if args.get('follow_id'):
+                    follow_ids.add(args['follow_id'])
+            elif action_type == 'MUTE':
+                target_id = args.get('user_id') or args.get('target_id')
+                if target_id:
+                    user_ids.add(target_id)
+            elif action_type in ('LIKE_COMMENT', 'DISLIKE_COMMENT'):
+                if args.get('comment_id'):
+                    comment_ids.add(args['comment_id'])
+        
+        # 第二遍：解析间接引用（转发的原帖、关注关系中的被关注者）
+        posts_meta = {
+            post_id: (original_post_id, quote_content)
+            for post_id, original_post_id, quote_content
+            in _select_in(cursor, "posts_meta", meta_post_ids)
+        }
+        post_ids.update(meta[0] for meta in posts_meta.values() if meta[0])
+        
+        followees = dict(_select_in(cursor, "follows", follow_ids))
+        user_ids.update(uid for uid in followees.values() if uid is not None)
+        
+        posts = _get_posts_info(cursor, post_ids, agent_names, cache)
+        comments = _get_comments_info(cursor, comment_ids, agent_names, cache)
+        user_names = _get_user_names(cursor, user_ids, agent_names, cache)
+        
+        # 第三遍：回填上下文
+        for action in actions:
+            action_type = action['action_type']
+            args = action['action_args']
+            
+            # 点赞/踩帖子、发表评论：补充帖子内容和作者
+            if action_type in ('LIKE_POST', 'DISLIKE_POST', 'CREATE_COMMENT'):
+                post_info = posts.get(args.get('post_id'))
                 if post_info:
-                    action_args['post_content'] = post_info.get('content', '')
-                    action_args['post_author_name'] = post_info.get('author_name', '')
-        
-        # 转发帖子：补充原帖内容和作者
-        elif action_type == 'REPOST':
-            new_post_id = action_args.get('new_post_id')
-            if new_post_id:
-                # 转发帖子的 original_post_id 指向原帖
-                cursor.execute("""
-                    SELECT original_post_id FROM post WHERE post_id = ?
-                """, (new_post_id,))
-                row = cursor.fetchone()
-                if row and row[0]:
-                    original_post_id = row[0]
-                    original_info = _get_post_info(cursor, original_post_id, agent_names)
+                    args['post_content'] = post_info['content']
+                    args['post_author_name'] = post_info['author_name']
+            
+            # 转发帖子：转发帖子的 original_post_id 指向原帖
+            elif action_type == 'REPOST':
+                meta = posts_meta.get(args.get('new_post_id'))
+                if meta and meta[0]:
+                    original_info = posts.get(meta[0])
                     if original_info:
-                        action_args['original_content'] = original_info.get('content', '')
-                        action_args['original_author_name'] = original_info.get('author_name', '')
-        
-        # 引用帖子：补充原帖内容、作者和引用评论
-        elif action_type == 'QUOTE_POST':
-            quoted_id = action_args.get('quoted_id')
-            new_post_id = action_args.get('new_post_id')
+                        args['original_content'] = original_info['content']
+                        args['original_author_name'] = original_info['author_name']
             
-            if quoted_id:
-                original_info = _get_post_info(cursor, quoted_id, agent_names)
+            # 引用帖子：补充原帖内容、作者和引用评论（quote_content）
+            elif action_type == 'QUOTE_POST':
+                original_info = posts.get(args.get('quoted_id'))
                 if original_info:
-                    action_args['original_content'] = original_info.get('content', '')
-                    action_args['original_author_name'] = original_info.get('author_name', '')
+                    args['original_content'] = original_info['content']
+                    args['original_author_name'] = original_info['author_name']
+                meta = posts_meta.get(args.get('new_post_id'))
+                if meta and meta[1]:
+                    args['quote_content'] = meta[1]
             
-            # 获取引用帖子的评论内容（quote_content）
-            if new_post_id:
-                cursor.execute("""
-                    SELECT quote_content FROM post WHERE post_id = ?
-                """, (new_post_id,))
-                row = cursor.fetchone()
-                if row and row[0]:
-                    action_args['quote_content'] = row[0]
-        
-        # 关注用户：补充被关注用户的名称
-        elif action_type == 'FOLLOW':
-            follow_id = action_args.get('follow_id')
-            if follow_id:
-                # 从 follow 表获取 followee_id
-                cursor.execute("""
-                    SELECT followee_id FROM follow WHERE follow_id = ?
-                """, (follow_id,))
-                row = cursor.fetchone()
-                if row:
-                    followee_id = row[0]
-                    target_name = _get_user_name(cursor, followee_id, agent_names)
+            # 关注用户：从 follow 表获取 followee_id，补充被关注用户的名称
+            elif action_type == 'FOLLOW':
+                follow_id = args.get('follow_id')
+                if follow_id in followees:
+                    target_name = user_names.get(followees[follow_id])
                     if target_name:
-                        action_args['target_user_name'] = target_name
-        
-        # 屏蔽用户：补充被屏蔽用户的名称
-        elif action_type == 'MUTE':
-            # 从 action_args 中获取 user_id 或 target_id
-            target_id = action_args.get('user_id') or action_args.get('target_id')
-            if target_id:
-                target_name = _get_user_name(cursor, target_id, agent_names)
+                        args['target_user_name'] = target_name
+            
+            # 屏蔽用户：补充被屏蔽用户的名称
+            elif action_type == 'MUTE':
+                target_id = args.get('user_id') or args.get('target_id')
+                target_name = user_names.get(target_id) if target_id else None
                 if target_name:
-                    action_args['target_user_name'] = target_name
-        
-        # 点赞/踩评论：补充评论内容和作者
-        elif action_type in ('LIKE_COMMENT', 'DISLIKE_COMMENT'):
-            comment_id = action_args.get('comment_id')
-            if comment_id:
-                comment_info = _get_comment_info(cursor, comment_id, agent_names)
+                    args['target_user_name'] = target_name
+            
+            # 点赞/踩评论：补充评论内容和作者
+            elif action_type in ('LIKE_COMMENT', 'DISLIKE_COMMENT'):
+                comment_info = comments.get(args.get('comment_id'))
                 if comment_info:
-                    action_args['comment_content'] = comment_info.get('content', '')
-                    action_args['comment_author_name'] = comment_info.get('author_name', '')
-        
-        # 发表评论：补充所评论的帖子信息
-        elif action_type == 'CREATE_COMMENT':
-            post_id = action_args.get('post_id')
-            if post_id:
-                post_info = _get_post_info(cursor, post_id, agent_names)
-                if post_info:
-                    action_args['post_content'] = post_info.get('content', '')
-                    action_args['post_author_name'] = post_info.get('author_name', '')
+                    args['comment_content'] = comment_info['content']
+                    args['comment_author_name'] = comment_info['author_name']
     
     except Exception as e:
         # 补充上下文失败不影响主流程
         print(f"补充动作上下文失败: {e}")
 
 
-def _get_post_info(
+def _get_posts_info(
     cursor,
-    post_id: int,
-    agent_names: Dict[int, str]
-) -> Optional[Dict[str, str]]:
+    post_ids,
+    agent_names: Dict[int, str],
+    cache: Optional[Dict[str, OrderedDict]] = None
+) -> Dict[int, Dict[str, str]]:
     """
-    获取帖子信息
+    批量获取帖子信息
     
     Args:
         cursor: 数据库游标
-        post_id: 帖子ID
+        post_ids: 帖子ID集合
         agent_names: agent_id -> agent_name 映射
+        cache: 查询结果缓存（可选）
         
     Returns:
-        包含 content 和 author_name 的字典，或 None
+        post_id -> {content, author_name} 的字典
     """
-    try:
-        cursor.execute("""
-            SELECT p.content, p.user_id, u.agent_id
-            FROM post p
-            LEFT JOIN user u ON p.user_id = u.user_id
-            WHERE p.post_id = ?
-        """, (post_id,))
-        row = cursor.fetchone()
-        if row:
-            content = row[0] or ''
-            user_id = row[1]
-            agent_id = row[2]
-            
-            # 优先使用 agent_names 中的名称
-            author_name = ''
-            if agent_id is not None and agent_id in agent_names:
-                author_name = agent_names[agent_id]
-            elif user_id:
-                # 从 user 表获取名称
-                cursor.execute("SELECT name, user_name FROM user WHERE user_id = ?", (user_id,))
-                user_row = cursor.fetchone()
-                if user_row:
-                    author_name = user_row[0] or user_row[1] or ''
-            
-            return {'content': content, 'author_name': author_name}
-    except Exception:
-        pass
-    return None
+    posts = {}
+    for post_id, content, user_id, agent_id, author_display in _select_in_cached(cursor, "posts_info", post_ids, cache):
+        # 优先使用 agent_names 中的名称，其次使用 user 表中的显示名称
+        author_name = ''
+        if agent_id is not None and agent_id in agent_names:
+            author_name = agent_names[agent_id]
+        elif user_id:
+            author_name = author_display
+        posts[post_id] = {'content': content or '', 'author_name': author_name}
+    return posts
 
 
-def _get_user_name(
+def _get_user_names(
     cursor,
-    user_id: int,
-    agent_names: Dict[int, str]
-) -> Optional[str]:
+    user_ids,
+    agent_names: Dict[int, str],
+    cache: Optional[Dict[str, OrderedDict]] = None
+) -> Dict[int, str]:
     """
-    获取用户名称
+    批量获取用户名称
     
     Args:
         cursor: 数据库游标
-        user_id: 用户ID
+        user_ids: 用户ID集合
         agent_names: agent_id -> agent_name 映射
+        cache: 查询结果缓存（可选）
         
     Returns:
-        用户名称，或 None
+        user_id -> 用户名称 的字典（不存在的用户不在字典中）
     """
-    try:
-        cursor.execute("""
-            SELECT agent_id, name, user_name FROM user WHERE user_id = ?
-        """, (user_id,))
-        row = cursor.fetchone()
-        if row:
-            agent_id = row[0]
-            name = row[1]
-            user_name = row[2]
-            
-            # 优先使用 agent_names 中的名称
-            if agent_id is not None and agent_id in agent_names:
-                return agent_names[agent_id]
-            return name or user_name or ''
-    except Exception:
-        pass
-    return None
+    names = {}
+    for user_id, agent_id, name, user_name in _select_in_cached(cursor, "users_name", user_ids, cache):
+        # 优先使用 agent_names 中的名称
+        if agent_id is not None and agent_id in agent_names:
+            names[user_id] = agent_names[agent_id]
+        else:
+            names[user_id] = name or user_name or ''
+    return names
 
 
-def _get_comment_info(
+def _get_comments_info(
     cursor,
-    comment_id: int,
-    agent_names: Dict[int, str]
-) -> Optional[Dict[str, str]]:
+    comment_ids,
+    agent_names: Dict[int, str],
+    cache: Optional[Dict[str, OrderedDict]] = None
+) -> Dict[int, Dict[str, str]]:
     """
-    获取评论信息
+    批量获取评论信息
     
     Args:
         cursor: 数据库游标
-        comment_id: 评论ID
+        comment_ids: 评论ID集合
         agent_names: agent_id -> agent_name 映射
+        cache: 查询结果缓存（可选）
         
     Returns:
-        包含 content 和 author_name 的字典，或 None
+        comment_id -> {content, author_name} 的字典
     """
-    try:
-        cursor.execute("""
-            SELECT c.content, c.user_id, u.agent_id
-            FROM comment c
-            LEFT JOIN user u ON c.user_id = u.user_id
-            WHERE c.comment_id = ?
-        """, (comment_id,))
-        row = cursor.fetchone()
-        if row:
-            content = row[0] or ''
-            user_id = row[1]
-            agent_id = row[2]
-            
-            # 优先使用 agent_names 中的名称
-            author_name = ''
-            if agent_id is not None and agent_id in agent_names:
-                author_name = agent_names[agent_id]
-            elif user_id:
-                # 从 user 表获取名称
-                cursor.execute("SELECT name, user_name FROM user WHERE user_id = ?", (user_id,))
-                user_row = cursor.fetchone()
-                if user_row:
-                    author_name = user_row[0] or user_row[1] or ''
-            
-            return {'content': content, 'author_name': author_name}
-    except Exception:
-        pass
-    return None
+    comments = {}
+    for comment_id, content, user_id, agent_id, author_display in _select_in_cached(cursor, "comments_info", comment_ids, cache):
+        # 优先使用 agent_names 中的名称，其次使用 user 表中的显示名称
+        author_name = ''
+        if agent_id is not None and agent_id in agent_names:
+            author_name = agent_names[agent_id]
+        elif user_id:
+            author_name = author_display
+        comments[comment_id] = {'content': content or '', 'author_name': author_name}
+    return comments
+
+
+# create_model 使用的 LLM 环境变量（.env 已在导入时加载，运行期间不会变化）
+_LLM_ENV_KEYS = (
+    "LLM_API_KEY", "LLM_BASE_URL", "LLM_MODEL_NAME",
+    "LLM_BOOST_API_KEY", "LLM_BOOST_BASE_URL", "LLM_BOOST_MODEL_NAME",
+)
+_LLM_ENV: Dict[str, str] = {}
+
+
+def _reload_llm_env():
+    """重新读取 LLM 相关环境变量（运行中修改了环境变量时调用）"""
+    global _LLM_ENV
+    _LLM_ENV = {key: os.environ.get(key, "") for key in _LLM_ENV_KEYS}
+
+
+_reload_llm_env()
 
 
 def create_model(config: Dict[str, Any], use_boost: bool = False):
@@ -996,9 +1542,10 @@ def create_model(config: Dict[str, Any], use_boost: bool = False):
         use_boost: 是否使用加速 LLM 配置（如果可用）
     """
     # 检查是否有加速配置
-    boost_api_key = os.environ.get("LLM_BOOST_API_KEY", "")
-    boost_base_url = os.environ.get("LLM_BOOST_BASE_URL", "")
-    boost_model = os.environ.get("LLM_BOOST_MODEL_NAME", "")
+    llm_env = _LLM_ENV
+    boost_api_key = llm_env["LLM_BOOST_API_KEY"]
+    boost_base_url = llm_env["LLM_BOOST_BASE_URL"]
+    boost_model = llm_env["LLM_BOOST_MODEL_NAME"]
     has_boost_config = bool(boost_api_key)
     
     # 根据参数和配置情况选择使用哪个 LLM
@@ -1006,13 +1553,13 @@ def create_model(config: Dict[str, Any], use_boost: bool = False):
         # 使用加速配置
         llm_api_key = boost_api_key
         llm_base_url = boost_base_url
-        llm_model = boost_model or os.environ.get("LLM_MODEL_NAME", "")
+        llm_model = boost_model or llm_env["LLM_MODEL_NAME"]
         config_label = "[加速LLM]"
     else:
         # 使用通用配置
-        llm_api_key = os.environ.get("LLM_API_KEY", "")
-        llm_base_url = os.environ.get("LLM_BASE_URL", "")
-        llm_model = os.environ.get("LLM_MODEL_NAME", "")
+        llm_api_key = llm_env["LLM_API_KEY"]
+        llm_base_url = llm_env["LLM_BASE_URL"]
+        llm_model = llm_env["LLM_MODEL_NAME"]
         config_label = "[通用LLM]"
     
     # 如果 .env 中没有模型名，则使用 config 作为备用
@@ -1037,47 +1584,27 @@ def create_model(config: Dict[str, Any], use_boost: bool = False):
     )
 
 
+# Agent 激活抽样使用的 numpy 随机数生成器（纯 Python 部分使用全局 random）
+_np_rng = np.random.default_rng() if np is not None else None
+
+
 def get_active_agents_for_round(
     env,
     config: Dict[str, Any],
     current_hour: int,
-    round_num: int
+    round_num: int,
+    agent_map: Optional[Dict[int, Any]] = None
 ) -> List:
-    """根据时间和配置决定本轮激活哪些Agent"""
-    time_config = config.get("time_config", {})
-    agent_configs = config.get("agent_configs", [])
-    
-    base_min = time_config.get("agents_per_hour_min", 5)
-    base_max = time_config.get("agents_per_hour_max", 20)
-    
-    peak_hours = time_config.get("peak_hours", [9, 10, 11, 14, 15, 20, 21, 22])
-    off_peak_hours = time_config.get("off_peak_hours", [0, 1, 2, 3, 4, 5])
-    
-    if current_hour in peak_hours:
-        multiplier = time_config.get("peak_activity_multiplier", 1.5)
-    elif current_hour in off_peak_hours:
-        multiplier = time_config.get("off_peak_activity_multiplier", 0.3)
-    else:
-        multiplier = 1.0
-    
-    target_count = int(random.uniform(base_min, base_max) * multiplier)
+    """
+    根据时间和配置决定本轮激活哪些Agent
     
-    candidates = []
-    for cfg in agent_configs:
-        agent_id = cfg.get("agent_id", 0)
-        active_hours = cfg.get("active_hours", list(range(8, 23)))
-        activity_level = cfg.get("activity_level", 0.5)
-        
-        if current_hour not in active_hours:
-            continue
-        
-        if random.random() < activity_level:
-            candidates.append(agent_id)
+    Args:
+        agent_map: 预先构建的 agent_id -> agent 映射（可选，不传则逐个查询 env.agent_graph）
+    """
+    selected_ids = sample_active_agent_ids(config, current_hour, random, _np_rng)
     
-    selected_ids = random.sample(
-        candidates, 
-        min(target_count, len(candidates))
-    ) if candidates else []
+    if agent_map is not None:
+        return [(agent_id, agent_map[agent_id]) for agent_id in selected_ids if agent_id in agent_map]
     
     active_agents = []
     for agent_id in selected_ids:
@@ -1090,6 +1617,48 @@ def get_active_agents_for_round(
     return active_agents
 
 
+class _NullActionLogger:
+    """空动作日志记录器：未传入 action_logger 时使用，所有方法均为空操作"""
+    
+    def log_simulation_start(self, *args, **kwargs):
+        pass
+    
+    def log_round_start(self, *args, **kwargs):
+        pass
+    
+    def log_action(self, *args, **kwargs):
+        pass
+    
+    def log_actions_batch(self, *args, **kwargs):
+        pass
+    
+    def log_round_end(self, *args, **kwargs):
+        pass
+    
+    def log_idle_span(self, *args, **kwargs):
+        pass
+    
+    def log_simulation_end(self, *args, **kwargs):
+        pass
+
+
+class _NullMainLogger:
+    """空主日志管理器：未传入 main_logger 时使用，所有方法均为空操作"""
+    
+    def info(self, message: str):
+        pass
+    
+    def warning(self, message: str):
+        pass
+    
+    def error(self, message: str):
+        pass
+
+
+_NULL_ACTION_LOGGER = _NullActionLogger()
+_NULL_MAIN_LOGGER = _NullMainLogger()
+
+
 class PlatformSimulation:
     """平台模拟结果容器"""
     def __init__(self):
@@ -1098,14 +1667,23 @@ class PlatformSimulation:
         self.total_actions = 0
 
 
-async def run_twitter_simulation(
-    config: Dict[str, Any], 
+async def _run_platform_simulation(
+    config: Dict[str, Any],
     simulation_dir: str,
-    action_logger: Optional[PlatformActionLogger] = None,
-    main_logger: Optional[SimulationLogManager] = None,
-    max_rounds: Optional[int] = None
+    action_logger: Optional[PlatformActionLogger],
+    main_logger: Optional[SimulationLogManager],
+    max_rounds: Optional[int],
+    *,
+    platform_name: str,
+    platform_enum,
+    profile_file: str,
+    profile_loader,
+    actions_list: List[ActionType],
+    use_boost: bool,
+    db_file: str,
+    merge_initial_posts: bool = False,
 ) -> PlatformSimulation:
-    """运行Twitter模拟
+    """运行单个平台的模拟（Twitter/Reddit 共用的模拟流程）
     
     Args:
         config: 模拟配置
@@ -1113,48 +1691,60 @@ async def run_twitter_simulation(
         action_logger: 动作日志记录器
         main_logger: 主日志管理器
         max_rounds: 最大模拟轮数（可选，用于截断过长的模拟）
+        platform_name: 平台显示名称，用于日志前缀
+        platform_enum: OASIS 平台类型
+        profile_file: Profile 文件名（相对于模拟目录）
+        profile_loader: 根据 Profile 文件生成 Agent 图的函数
+        actions_list: 该平台可用的动作列表
+        use_boost: 是否使用加速 LLM 配置
+        db_file: 模拟数据库文件名（相对于模拟目录）
+        merge_initial_posts: 同一 Agent 有多条初始帖子时是否合并为动作列表
         
     Returns:
         PlatformSimulation: 包含env和agent_graph的结果对象
     """
     result = PlatformSimulation()
+    # 未传入日志记录器时使用空实现，循环内无需逐次判断
+    action_logger = action_logger or _NULL_ACTION_LOGGER
+    main_logger = main_logger or _NULL_MAIN_LOGGER
     
     def log_info(msg):
-        if main_logger:
-            main_logger.info(f"[Twitter] {msg}")
-        print(f"[Twitter] {msg}")
+        main_logger.info(f"[{platform_name}] {msg}")
+        print(f"[{platform_name}] {msg}")
     
     log_info("初始化...")
     
-    # Twitter 使用通用 LLM 配置
-    model = create_model(config, use_boost=False)
+    model = create_model(config, use_boost=use_boost)
     
-    # OASIS Twitter使用CSV格式
-    profile_path = os.path.join(simulation_dir, "twitter_profiles.csv")
-    if not os.path.exists(profile_path):
+    profile_path = os.path.join(simulation_dir, profile_file)
+    if not os.path.isfile(profile_path):
         log_info(f"错误: Profile文件不存在: {profile_path}")
         return result
     
-    result.agent_graph = await generate_twitter_agent_graph(
+    result.agent_graph = await profile_loader(
         profile_path=profile_path,
         model=model,
-        available_actions=TWITTER_ACTIONS,
+        available_actions=actions_list,
     )
     
+    # agent_id -> agent 映射只构建一次，初始帖子和每轮激活 Agent 都直接查表
+    agent_map = dict(result.agent_graph.get_agents())
+    
     # 从配置文件获取 Agent 真实名称映射（使用 entity_name 而非默认的 Agent_X）
     agent_names = get_agent_names_from_config(config)
     # 如果配置中没有某个 agent，则使用 OASIS 的默认名称
-    for agent_id, agent in result.agent_graph.get_agents():
-        if agent_id not in agent_names:
-            agent_names[agent_id] = getattr(agent, 'name', f'Agent_{agent_id}')
+    for agent_id, agent in agent_map.items():
+        if agent_id in agent_names:
+            continue
+        agent_names[agent_id] = getattr(agent, 'name', None) or f'Agent_{agent_id}'
     
-    db_path = os.path.join(simulation_dir, "twitter_simulation.db")
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    db_path = os.path.join(simulation_dir, db_file)
+    # 删除上次运行留下的数据库（一次 unlink，文件不存在时忽略）
+    Path(db_path).unlink(missing_ok=True)
     
     result.env = oasis.make(
         agent_graph=result.agent_graph,
-        platform=oasis.DefaultPlatformType.TWITTER,
+        platform=platform_enum,
         database_path=db_path,
         semaphore=30,  # 限制最大并发 LLM 请求数，防止 API 过载
     )
@@ -1162,134 +1752,179 @@ async def run_twitter_simulation(
     await result.env.reset()
     log_info("环境已启动")
     
-    if action_logger:
-        action_logger.log_simulation_start(config)
+    action_logger.log_simulation_start(config)
     
     total_actions = 0
     last_rowid = 0  # 跟踪数据库中最后处理的行号（使用 rowid 避免 created_at 格式差异）
+    # 整个模拟循环复用同一个只读连接，避免每轮重新打开数据库
+    db_conn = _connect_db(db_path)
+    # 在 try 之前记录，耗时包含初始事件阶段；只用于计算耗时，不受系统时钟调整影响
+    start_time = time.monotonic()
     
-    # 执行初始事件
-    event_config = config.get("event_config", {})
-    initial_posts = event_config.get("initial_posts", [])
-    
-    # 记录 round 0 开始（初始事件阶段）
-    if action_logger:
+    try:
+        # 执行初始事件
+        event_config = config.get("event_config", {})
+        initial_posts = event_config.get("initial_posts", [])
+        
+        # 记录 round 0 开始（初始事件阶段）
         action_logger.log_round_start(0, 0)  # round 0, simulated_hour 0
-    
-    initial_action_count = 0
-    if initial_posts:
-        initial_actions = {}
-        for post in initial_posts:
-            agent_id = post.get("poster_agent_id", 0)
-            content = post.get("content", "")
-            try:
-                agent = result.env.agent_graph.get_agent(agent_id)
-                initial_actions[agent] = ManualAction(
+        
+        initial_action_count = 0
+        if initial_posts:
+            initial_actions = {}
+            for post in initial_posts:
+                agent_id = post.get("poster_agent_id", 0)
+                content = post.get("content", "")
+                agent = agent_map.get(agent_id)
+                if agent is None:
+                    continue
+                # agent_map 中的每个 Agent 在 agent_names 中都有名称，直接取值即可
+                agent_name = agent_names[agent_id]
+                
+                action = ManualAction(
                     action_type=ActionType.CREATE_POST,
                     action_args={"content": content}
                 )
+                if merge_initial_posts and agent in initial_actions:
+                    # 同一 Agent 的多条初始帖子合并为动作列表，一次 step 全部执行
+                    if not isinstance(initial_actions[agent], list):
+                        initial_actions[agent] = [initial_actions[agent]]
+                    initial_actions[agent].append(action)
+                else:
+                    initial_actions[agent] = action
                 
-                if action_logger:
-                    action_logger.log_action(
-                        round_num=0,
-                        agent_id=agent_id,
-                        agent_name=agent_names.get(agent_id, f"Agent_{agent_id}"),
-                        action_type="CREATE_POST",
-                        action_args={"content": content}
-                    )
-                    total_actions += 1
-                    initial_action_count += 1
-            except Exception:
-                pass
-        
-        if initial_actions:
-            await result.env.step(initial_actions)
-            log_info(f"已发布 {len(initial_actions)} 条初始帖子")
-    
-    # 记录 round 0 结束
-    if action_logger:
-        action_logger.log_round_end(0, initial_action_count)
-    
-    # 主模拟循环
-    time_config = config.get("time_config", {})
-    total_hours = time_config.get("total_simulation_hours", 72)
-    minutes_per_round = time_config.get("minutes_per_round", 30)
-    total_rounds = (total_hours * 60) // minutes_per_round
-    
-    # 如果指定了最大轮数，则截断
-    if max_rounds is not None and max_rounds > 0:
-        original_rounds = total_rounds
-        total_rounds = min(total_rounds, max_rounds)
-        if total_rounds < original_rounds:
-            log_info(f"轮数已截断: {original_rounds} -> {total_rounds} (max_rounds={max_rounds})")
-    
-    start_time = datetime.now()
-    
-    for round_num in range(total_rounds):
-        # 检查是否收到退出信号
-        if _shutdown_event and _shutdown_event.is_set():
-            if main_logger:
-                main_logger.info(f"收到退出信号，在第 {round_num + 1} 轮停止模拟")
-            break
-        
-        simulated_minutes = round_num * minutes_per_round
-        simulated_hour = (simulated_minutes // 60) % 24
-        simulated_day = simulated_minutes // (60 * 24) + 1
-        
-        active_agents = get_active_agents_for_round(
-            result.env, config, simulated_hour, round_num
-        )
-        
-        # 无论是否有活跃agent，都记录round开始
-        if action_logger:
-            action_logger.log_round_start(round_num + 1, simulated_hour)
-        
-        if not active_agents:
-            # 没有活跃agent时也记录round结束（actions_count=0）
-            if action_logger:
-                action_logger.log_round_end(round_num + 1, 0)
-            continue
-        
-        actions = {agent: LLMAction() for _, agent in active_agents}
-        await result.env.step(actions)
-        
-        # 从数据库获取实际执行的动作并记录
-        actual_actions, last_rowid = fetch_new_actions_from_db(
-            db_path, last_rowid, agent_names
-        )
-        
-        round_action_count = 0
-        for action_data in actual_actions:
-            if action_logger:
                 action_logger.log_action(
-                    round_num=round_num + 1,
-                    agent_id=action_data['agent_id'],
-                    agent_name=action_data['agent_name'],
-                    action_type=action_data['action_type'],
-                    action_args=action_data['action_args']
+                    round_num=0,
+                    agent_id=agent_id,
+                    agent_name=agent_name,
+                    action_type="CREATE_POST",
+                    action_args={"content": content}
                 )
                 total_actions += 1
-                round_action_count += 1
+                initial_action_count += 1
+            
+            if initial_actions:
+                await result.env.step(initial_actions)
+                log_info(f"已发布 {len(initial_actions)} 条初始帖子")
+        
+        # 记录 round 0 结束
+        action_logger.log_round_end(0, initial_action_count)
         
-        if action_logger:
+        # 主模拟循环
+        time_config = config.get("time_config", {})
+        total_hours = time_config.get("total_simulation_hours", 72)
+        minutes_per_round = time_config.get("minutes_per_round", 30)
+        total_rounds = (total_hours * 60) // minutes_per_round
+        
+        # 如果指定了最大轮数，则截断
+        if max_rounds is not None and max_rounds > 0:
+            original_rounds = total_rounds
+            total_rounds = min(total_rounds, max_rounds)
+            if total_rounds < original_rounds:
+                log_info(f"轮数已截断: {original_rounds} -> {total_rounds} (max_rounds={max_rounds})")
+        
+        # 当前连续空闲轮次区间的起止轮次（idle_span_start 为 None 表示不在空闲区间内）
+        idle_span_start = None
+        idle_span_end = 0
+        
+        for round_num in range(total_rounds):
+            # 检查是否收到退出信号
+            if _shutdown_event and _shutdown_event.is_set():
+                main_logger.info(f"收到退出信号，在第 {round_num + 1} 轮停止模拟")
+                break
+            
+            simulated_minutes = round_num * minutes_per_round
+            simulated_hour = (simulated_minutes // 60) % 24
+            simulated_day = simulated_minutes // (60 * 24) + 1
+            
+            active_agents = get_active_agents_for_round(
+                result.env, config, simulated_hour, round_num, agent_map
+            )
+            
+            if not active_agents:
+                # 没有活跃agent的轮次不单独记录，合并为一个空闲区间
+                if idle_span_start is None:
+                    idle_span_start = round_num + 1
+                idle_span_end = round_num + 1
+                continue
+            
+            if idle_span_start is not None:
+                action_logger.log_idle_span(idle_span_start, idle_span_end)
+                idle_span_start = None
+            
+            action_logger.log_round_start(round_num + 1, simulated_hour)
+            
+            actions = dict.fromkeys((agent for _, agent in active_agents), _LLM_ACTION)
+            await result.env.step(actions)
+            
+            # 从数据库获取实际执行的动作并记录
+            # 在工作线程中读取数据库，避免阻塞另一个平台的模拟协程
+            actual_actions, last_rowid = await asyncio.to_thread(
+                fetch_new_actions_from_db, db_path, last_rowid, agent_names, db_conn
+            )
+            
+            # 整轮动作一次性写入动作日志
+            action_logger.log_actions_batch(round_num + 1, actual_actions)
+            round_action_count = len(actual_actions)
+            total_actions += round_action_count
+            
             action_logger.log_round_end(round_num + 1, round_action_count)
+            
+            if (round_num + 1) % 20 == 0:
+                progress = (round_num + 1) / total_rounds * 100
+                log_info(f"Day {simulated_day}, {simulated_hour:02d}:00 - Round {round_num + 1}/{total_rounds} ({progress:.1f}%)")
         
-        if (round_num + 1) % 20 == 0:
-            progress = (round_num + 1) / total_rounds * 100
-            log_info(f"Day {simulated_day}, {simulated_hour:02d}:00 - Round {round_num + 1}/{total_rounds} ({progress:.1f}%)")
+        if idle_span_start is not None:
+            action_logger.log_idle_span(idle_span_start, idle_span_end)
+    finally:
+        # 出错或平台任务被取消（如收到 SIGTERM）时同样关闭连接
+        db_conn.close()
+    
+    _clear_lookup_cache(db_path)
     
     # 注意：不关闭环境，保留给Interview使用
     
-    if action_logger:
-        action_logger.log_simulation_end(total_rounds, total_actions)
+    action_logger.log_simulation_end(total_rounds, total_actions)
     
     result.total_actions = total_actions
-    elapsed = (datetime.now() - start_time).total_seconds()
+    elapsed = time.monotonic() - start_time
     log_info(f"模拟循环完成! 耗时: {elapsed:.1f}秒, 总动作: {total_actions}")
     
     return result
 
 
+async def run_twitter_simulation(
+    config: Dict[str, Any], 
+    simulation_dir: str,
+    action_logger: Optional[PlatformActionLogger] = None,
+    main_logger: Optional[SimulationLogManager] = None,
+    max_rounds: Optional[int] = None
+) -> PlatformSimulation:
+    """运行Twitter模拟
+    
+    Args:
+        config: 模拟配置
+        simulation_dir: 模拟目录
+        action_logger: 动作日志记录器
+        main_logger: 主日志管理器
+        max_rounds: 最大模拟轮数（可选，用于截断过长的模拟）
+        
+    Returns:
+        PlatformSimulation: 包含env和agent_graph的结果对象
+    """
+    # Twitter 使用通用 LLM 配置，OASIS Twitter使用CSV格式
+    return await _run_platform_simulation(
+        config, simulation_dir, action_logger, main_logger, max_rounds,
+        platform_name="Twitter",
+        platform_enum=oasis.DefaultPlatformType.TWITTER,
+        profile_file="twitter_profiles.csv",
+        profile_loader=generate_twitter_agent_graph,
+        actions_list=TWITTER_ACTIONS,
+        use_boost=False,
+        db_file="twitter_simulation.db",
+    )
+
+
 async def run_reddit_simulation(
     config: Dict[str, Any], 
     simulation_dir: str,
@@ -1309,184 +1944,18 @@ async def run_reddit_simulation(
     Returns:
         PlatformSimulation: 包含env和agent_graph的结果对象
     """
-    result = PlatformSimulation()
-    
-    def log_info(msg):
-        if main_logger:
-            main_logger.info(f"[Reddit] {msg}")
-        print(f"[Reddit] {msg}")
-    
-    log_info("初始化...")
-    
     # Reddit 使用加速 LLM 配置（如果有的话，否则回退到通用配置）
-    model = create_model(config, use_boost=True)
-    
-    profile_path = os.path.join(simulation_dir, "reddit_profiles.json")
-    if not os.path.exists(profile_path):
-        log_info(f"错误: Profile文件不存在: {profile_path}")
-        return result
-    
-    result.agent_graph = await generate_reddit_agent_graph(
-        profile_path=profile_path,
-        model=model,
-        available_actions=REDDIT_ACTIONS,
+    return await _run_platform_simulation(
+        config, simulation_dir, action_logger, main_logger, max_rounds,
+        platform_name="Reddit",
+        platform_enum=oasis.DefaultPlatformType.REDDIT,
+        profile_file="reddit_profiles.json",
+        profile_loader=generate_reddit_agent_graph,
+        actions_list=REDDIT_ACTIONS,
+        use_boost=True,
+        db_file="reddit_simulation.db",
+        merge_initial_posts=True,
     )
-    
-    # 从配置文件获取 Agent 真实名称映射（使用 entity_name 而非默认的 Agent_X）
-    agent_names = get_agent_names_from_config(config)
-    # 如果配置中没有某个 agent，则使用 OASIS 的默认名称
-    for agent_id, agent in result.agent_graph.get_agents():
-        if agent_id not in agent_names:
-            agent_names[agent_id] = getattr(agent, 'name', f'Agent_{agent_id}')
-    
-    db_path = os.path.join(simulation_dir, "reddit_simulation.db")
-    if os.path.exists(db_path):
-        os.remove(db_path)
-    
-    result.env = oasis.make(
-        agent_graph=result.agent_graph,
-        platform=oasis.DefaultPlatformType.REDDIT,
-        database_path=db_path,
-        semaphore=30,  # 限制最大并发 LLM 请求数，防止 API 过载
-    )
-    
-    await result.env.reset()
-    log_info("环境已启动")
-    
-    if action_logger:
-        action_logger.log_simulation_start(config)
-    
-    total_actions = 0
-    last_rowid = 0  # 跟踪数据库中最后处理的行号（使用 rowid 避免 created_at 格式差异）
-    
-    # 执行初始事件
-    event_config = config.get("event_config", {})
-    initial_posts = event_config.get("initial_posts", [])
-    
-    # 记录 round 0 开始（初始事件阶段）
-    if action_logger:
-        action_logger.log_round_start(0, 0)  # round 0, simulated_hour 0
-    
-    initial_action_count = 0
-    if initial_posts:
-        initial_actions = {}
-        for post in initial_posts:
-            agent_id = post.get("poster_agent_id", 0)
-            content = post.get("content", "")
-            try:
-                agent = result.env.agent_graph.get_agent(agent_id)
-                if agent in initial_actions:
-                    if not isinstance(initial_actions[agent], list):
-                        initial_actions[agent] = [initial_actions[agent]]
-                    initial_actions[agent].append(ManualAction(
-                        action_type=ActionType.CREATE_POST,
-                        action_args={"content": content}
-                    ))
-                else:
-                    initial_actions[agent] = ManualAction(
-                        action_type=ActionType.CREATE_POST,
-                        action_args={"content": content}
-                    )
-                
-                if action_logger:
-                    action_logger.log_action(
-                        round_num=0,
-                        agent_id=agent_id,
-                        agent_name=agent_names.get(agent_id, f"Agent_{agent_id}"),
-                        action_type="CREATE_POST",
-                        action_args={"content": content}
-                    )
-                    total_actions += 1
-                    initial_action_count += 1
-            except Exception:
-                pass
-        
-        if initial_actions:
-            await result.env.step(initial_actions)
-            log_info(f"已发布 {len(initial_actions)} 条初始帖子")
-    
-    # 记录 round 0 结束
-    if action_logger:
-        action_logger.log_round_end(0, initial_action_count)
-    
-    # 主模拟循环
-    time_config = config.get("time_config", {})
-    total_hours = time_config.get("total_simulation_hours", 72)
-    minutes_per_round = time_config.get("minutes_per_round", 30)
-    total_rounds = (total_hours * 60) // minutes_per_round
-    
-    # 如果指定了最大轮数，则截断
-    if max_rounds is not None and max_rounds > 0:
-        original_rounds = total_rounds
-        total_rounds = min(total_rounds, max_rounds)
-        if total_rounds < original_rounds:
-            log_info(f"轮数已截断: {original_rounds} -> {total_rounds} (max_rounds={max_rounds})")
-    
-    start_time = datetime.now()
-    
-    for round_num in range(total_rounds):
-        # 检查是否收到退出信号
-        if _shutdown_event and _shutdown_event.is_set():
-            if main_logger:
-                main_logger.info(f"收到退出信号，在第 {round_num + 1} 轮停止模拟")
-            break
-        
-        simulated_minutes = round_num * minutes_per_round
-        simulated_hour = (simulated_minutes // 60) % 24
-        simulated_day = simulated_minutes // (60 * 24) + 1
-        
-        active_agents = get_active_agents_for_round(
-            result.env, config, simulated_hour, round_num
-        )
-        
-        # 无论是否有活跃agent，都记录round开始
-        if action_logger:
-            action_logger.log_round_start(round_num + 1, simulated_hour)
-        
-        if not active_agents:
-            # 没有活跃agent时也记录round结束（actions_count=0）
-            if action_logger:
-                action_logger.log_round_end(round_num + 1, 0)
-            continue
-        
-        actions = {agent: LLMAction() for _, agent in active_agents}
-        await result.env.step(actions)
-        
-        # 从数据库获取实际执行的动作并记录
-        actual_actions, last_rowid = fetch_new_actions_from_db(
-            db_path, last_rowid, agent_names
-        )
-        
-        round_action_count = 0
-        for action_data in actual_actions:
-            if action_logger:
-                action_logger.log_action(
-                    round_num=round_num + 1,
-                    agent_id=action_data['agent_id'],
-                    agent_name=action_data['agent_name'],
-                    action_type=action_data['action_type'],
-                    action_args=action_data['action_args']
-                )
-                total_actions += 1
-                round_action_count += 1
-        
-        if action_logger:
-            action_logger.log_round_end(round_num + 1, round_action_count)
-        
-        if (round_num + 1) % 20 == 0:
-            progress = (round_num + 1) / total_rounds * 100
-            log_info(f"Day {simulated_day}, {simulated_hour:02d}:00 - Round {round_num + 1}/{total_rounds} ({progress:.1f}%)")
-    
-    # 注意：不关闭环境，保留给Interview使用
-    
-    if action_logger:
-        action_logger.log_simulation_end(total_rounds, total_actions)
-    
-    result.total_actions = total_actions
-    elapsed = (datetime.now() - start_time).total_seconds()
-    log_info(f"模拟循环完成! 耗时: {elapsed:.1f}秒, 总动作: {total_actions}")
-    
-    return result
 
 
 async def main():
@@ -1538,7 +2007,7 @@ async def main():
     init_logging_for_simulation(simulation_dir)
     
     # 创建日志管理器
-    log_manager = SimulationLogManager(simulation_dir)
+    log_manager = SimulationLogManager(simulation_dir, truncate_main_log=True)
     twitter_logger = log_manager.get_twitter_logger()
     reddit_logger = log_manager.get_reddit_logger()
     
@@ -1570,7 +2039,7 @@ async def main():
     log_manager.info(f"  - Reddit动作: reddit/actions.jsonl")
     log_manager.info("=" * 60)
     
-    start_time = datetime.now()
+    start_time = time.monotonic()  # 只用于计算耗时，不受系统时钟调整影响
     
     # 存储两个平台的模拟结果
     twitter_result: Optional[PlatformSimulation] = None
@@ -1588,7 +2057,7 @@ async def main():
         )
         twitter_result, reddit_result = results
     
-    total_elapsed = (datetime.now() - start_time).total_seconds()
+    total_elapsed = time.monotonic() - start_time
     log_manager.info("=" * 60)
     log_manager.info(f"模拟循环完成! 总耗时: {total_elapsed:.1f}秒")
     
@@ -1608,6 +2077,7 @@ async def main():
             reddit_env=reddit_result.env if reddit_result else None,
             reddit_agent_graph=reddit_result.agent_graph if reddit_result else None
         )
+        await ipc_handler.start_socket_server()
         ipc_handler.update_status("alive")
         
         # 等待命令循环（使用全局 _shutdown_event）
@@ -1631,6 +2101,7 @@ async def main():
         
         log_manager.info("\n关闭环境...")
         ipc_handler.update_status("stopped")
+        ipc_handler.close()
     
     # 关闭环境
     if twitter_result and twitter_result.env:
@@ -1641,6 +2112,9 @@ async def main():
         await reddit_result.env.close()
         log_manager.info("[Reddit] 环境已关闭")
     
+    # 写完队列中剩余的动作日志
+    log_manager.close()
+    
     log_manager.info("=" * 60)
     log_manager.info(f"全部完成!")
     log_manager.info(f"日志文件:")
@@ -17,13 +17,18 @@ import argparse
 import asyncio
 import json
 import logging
+import logging.handlers
 import os
 import random
+import shutil
 import signal
 import sys
 import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 # 全局变量：用于信号处理
 _shutdown_event = None
@@ -50,6 +55,14 @@ else:
 import re
 
 
+def _replace_unicode_escape(match):
+    """把一个 \\uXXXX 转义序列还原为对应字符（模块级函数，避免每条日志重新创建闭包）"""
+    try:
+        return chr(int(match.group(1), 16))
+    except (ValueError, OverflowError):
+        return match.group(0)
+
+
 class UnicodeFormatter(logging.Formatter):
     """自定义格式化器，将 Unicode 转义序列转换为可读字符"""
     
@@ -57,43 +70,43 @@ class UnicodeFormatter(logging.Formatter):
     
     def format(self, record):
         result = super().format(record)
-        
-        def replace_unicode(match):
-            try:
-                return chr(int(match.group(1), 16))
-            except (ValueError, OverflowError):
-                return match.group(0)
-        
-        return self.UNICODE_ESCAPE_PATTERN.sub(replace_unicode, result)
+        if '\\u' not in result:
+            # 绝大多数日志不含转义序列，直接返回
+            return result
+        # 不使用 codecs 的 unicode_escape 整体解码：它会把已有的中文等非 ASCII 字符
+        # 和其他反斜杠转义一并改写，只替换 \uXXXX 才能保持日志原文不变
+        return self.UNICODE_ESCAPE_PATTERN.sub(_replace_unicode_escape, result)
 
 
 class MaxTokensWarningFilter(logging.Filter):
     """过滤掉 camel-ai 关于 max_tokens 的警告（我们故意不设置 max_tokens，让模型自行决定）"""
     
     def filter(self, record):
+        # 只检查原始消息模板，不调用 getMessage()（避免为每条记录格式化参数）
+        msg = record.msg
+        if not isinstance(msg, str):
+            return True
         # 过滤掉包含 max_tokens 警告的日志
-        if "max_tokens" in record.getMessage() and "Invalid or missing" in record.getMessage():
-            return False
-        return True
+        return not ("max_tokens" in msg and "Invalid or missing" in msg)
 
 
 # 在模块加载时立即添加过滤器，确保在 camel 代码执行前生效
 logging.getLogger().addFilter(MaxTokensWarningFilter())
 
 
+# OASIS 日志的内存缓冲容量（条）：缓冲满、出现 ERROR 级别记录或每轮结束时批量写入文件
+_OASIS_LOG_BUFFER_CAPACITY = 256
+
+# setup_oasis_logging 创建的缓冲处理器，供 flush_oasis_logging 统一刷新
+_oasis_log_buffers: List[logging.handlers.MemoryHandler] = []
+
+
 def setup_oasis_logging(log_dir: str):
     """配置 OASIS 的日志，使用固定名称的日志文件"""
+    # 清理旧的日志文件：日志目录只存放这里配置的 OASIS 日志，直接整体删除后重建
+    shutil.rmtree(log_dir, ignore_errors=True)
     os.makedirs(log_dir, exist_ok=True)
     
-    # 清理旧的日志文件
-    for f in os.listdir(log_dir):
-        old_log = os.path.join(log_dir, f)
-        if os.path.isfile(old_log) and f.endswith('.log'):
-            try:
-                os.remove(old_log)
-            except OSError:
-                pass
-    
     formatter = UnicodeFormatter("%(levelname)s - %(asctime)s - %(name)s - %(message)s")
     
     loggers_config = {
@@ -104,6 +117,7 @@ def setup_oasis_logging(log_dir: str):
         "table": os.path.join(log_dir, "table.log"),
     }
     
+    _oasis_log_buffers.clear()
     for logger_name, log_file in loggers_config.items():
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.DEBUG)
@@ -111,9 +125,39 @@ def setup_oasis_logging(log_dir: str):
         file_handler = logging.FileHandler(log_file, encoding='utf-8', mode='w')
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        # OASIS 日志量很大，先在内存中攒批再写文件，减少逐条 write 的系统调用
+        buffer_handler = logging.handlers.MemoryHandler(
+            capacity=_OASIS_LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
+        logger.addHandler(buffer_handler)
         logger.propagate = False
+        _oasis_log_buffers.append(buffer_handler)
+
+
+def flush_oasis_logging():
+    """把缓冲中的 OASIS 日志写入文件（每轮结束、每批命令处理完及关闭环境时调用）"""
+    for buffer_handler in _oasis_log_buffers:
+        buffer_handler.flush()
+
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时使用纯 Python 抽样
+    np = None
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 为可选依赖，缺失时回退到目录轮询
+    FileSystemEventHandler = object
+    Observer = None
 
 try:
     from camel.models import ModelFactory
@@ -130,12 +174,45 @@ except ImportError as e:
     print("请先安装: pip install oasis-ai camel-ai")
     sys.exit(1)
 
+from action_logger import timestamp
+from agent_activity import sample_active_agent_ids
+from app.utils.file_io import write_file_atomic
+
 
 # IPC相关常量
 IPC_COMMANDS_DIR = "ipc_commands"
 IPC_RESPONSES_DIR = "ipc_responses"
 ENV_STATUS_FILE = "env_status.json"
 
+# 命令目录修改后经过该时长才认为目录状态稳定，可以按修改时间跳过扫描
+_COMMANDS_DIR_SETTLE_SECONDS = 1.0
+
+# 最新 Interview 结果查询（模块级常量：每次执行同一 SQL 文本，命中 sqlite3 的预编译语句缓存）
+# rowid 单调递增，按 rowid 取最新记录可直接利用 idx_trace_action_user 索引
+_INTERVIEW_RESULT_SQL = """
+    SELECT user_id, info, created_at
+    FROM trace
+    WHERE action = ? AND user_id = ?
+    ORDER BY rowid DESC
+    LIMIT 1
+"""
+_INTERVIEW_ACTION = ActionType.INTERVIEW.value
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """序列化为带缩进的 UTF-8 JSON 字节串（IPC 响应、状态文件使用）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _json_loads(data):
+    """解析 JSON（str 或 bytes），解析失败抛出 json.JSONDecodeError"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class CommandType:
     """命令类型常量"""
     INTERVIEW = "interview"
@@ -143,13 +220,37 @@ class CommandType:
     CLOSE_ENV = "close_env"
 
 
+class _CommandFileWatcher(FileSystemEventHandler):
+    """监听命令目录，把新出现的命令文件路径交给 push 加入待处理队列并唤醒事件循环（在 watchdog 线程中回调）"""
+    
+    def __init__(self, push, loop: asyncio.AbstractEventLoop, ready: asyncio.Event):
+        super().__init__()
+        self.push = push
+        self.loop = loop
+        self.ready = ready
+    
+    def _push(self, path: str):
+        if self.push(path):
+            self.loop.call_soon_threadsafe(self.ready.set)
+    
+    def on_created(self, event):
+        if not event.is_directory and event.src_path.endswith('.json'):
+            self._push(event.src_path)
+    
+    def on_moved(self, event):
+        if not event.is_directory and event.dest_path.endswith('.json'):
+            self._push(event.dest_path)
+
+
 class IPCHandler:
     """IPC命令处理器"""
     
-    def __init__(self, simulation_dir: str, env, agent_graph):
+    def __init__(self, simulation_dir: str, env, agent_graph, agent_map: Optional[Dict[int, Any]] = None):
         self.simulation_dir = simulation_dir
         self.env = env
         self.agent_graph = agent_graph
+        # agent_id -> agent 映射（可由运行器传入已构建好的映射），采访时直接查表
+        self.agent_map = agent_map if agent_map is not None else dict(agent_graph.get_agents())
         self.commands_dir = os.path.join(simulation_dir, IPC_COMMANDS_DIR)
         self.responses_dir = os.path.join(simulation_dir, IPC_RESPONSES_DIR)
         self.status_file = os.path.join(simulation_dir, ENV_STATUS_FILE)
@@ -158,37 +259,215 @@ class IPCHandler:
         # 确保目录存在
         os.makedirs(self.commands_dir, exist_ok=True)
         os.makedirs(self.responses_dir, exist_ok=True)
+        
+        # 命令目录监听：有 watchdog 时由文件系统事件推送新命令并立即唤醒等待循环，
+        # 否则每次轮询扫描目录；已在队列中的路径另存一份集合，监听线程与启动时的目录扫描推入同一个文件时不重复入队
+        self._pending_commands: deque = deque()
+        self._queued_command_files: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._command_ready = asyncio.Event()
+        self._observer = None
+        # 轮询模式下已成功解析的命令文件 -> 解析时的 (修改时间纳秒, 文件大小)：
+        # 已分发但尚未被删除的文件在未再变化前不重复解析
+        self._seen_command_files: Dict[str, Tuple[int, int]] = {}
+        # 轮询模式下上次完整扫描时命令目录的修改时间：目录未变化（没有新增或删除文件）时跳过扫描
+        self._commands_dir_mtime: Optional[int] = None
+        self._start_command_watcher()
+        
+        # Interview 结果查询复用一个数据库连接（首次查询时建立）
+        self.db_path = os.path.join(simulation_dir, "reddit_simulation.db")
+        self._db_conn: Optional[sqlite3.Connection] = None
+    
+    def _start_command_watcher(self):
+        """启动命令目录监听，并把已存在的命令文件加入待处理队列"""
+        if Observer is None:
+            return
+        try:
+            observer = Observer()
+            observer.schedule(
+                _CommandFileWatcher(self._queue_command_file, asyncio.get_running_loop(), self._command_ready),
+                self.commands_dir
+            )
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            print(f"  命令目录监听启动失败，回退到轮询模式: {e}")
+            return
+        self._observer = observer
+        for _, filepath in self._scan_command_files():
+            self._queue_command_file(filepath)
+    
+    def _queue_command_file(self, filepath: str) -> bool:
+        """
+        把命令文件加入待处理队列（监听线程与事件循环线程都会调用）
+        
+        Returns:
+            是否新加入了队列（路径已在队列中时返回 False）
+        """
+        with self._pending_lock:
+            if filepath in self._queued_command_files:
+                return False
+            self._queued_command_files.add(filepath)
+            self._pending_commands.append(filepath)
+        return True
+    
+    def _pop_command_file(self) -> str:
+        """取出队首的命令文件路径"""
+        with self._pending_lock:
+            filepath = self._pending_commands.popleft()
+            self._queued_command_files.discard(filepath)
+        return filepath
+    
+    def _reject_command_file(self, filepath: str, error: Exception):
+        """
+        命令文件无法解析时直接返回失败响应（同时删除命令文件）
+        
+        命令文件由 Flask 端原子写入，读取到的总是完整文件，解析失败说明文件本身有误，重试也不会成功
+        """
+        command_id = os.path.splitext(os.path.basename(filepath))[0]
+        print(f"  命令文件无法解析，已忽略: {filepath} ({error})")
+        self.send_response(command_id, "failed", error=f"命令文件无法解析: {error}")
+    
+    def close(self):
+        """停止命令目录监听，关闭数据库连接"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        
+        if self._db_conn is not None:
+            try:
+                self._db_conn.execute("PRAGMA optimize")
+                self._db_conn.close()
+            except sqlite3.Error:
+                pass
+            self._db_conn = None
+    
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        """
+        获取模拟数据库连接（首次调用时建立）
+        
+        建立连接时为 trace 表创建 (action, user_id) 索引：SQLite 的普通索引隐含 rowid，
+        按 rowid 倒序取最新一条可直接在索引上完成，不再全表扫描并排序
+        """
+        if self._db_conn is None:
+            if not os.path.exists(self.db_path):
+                return None
+            conn = sqlite3.connect(self.db_path, cached_statements=256)
+            try:
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_trace_action_user ON trace(action, user_id)"
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                # 数据库被 OASIS 占用写锁等情况下跳过，查询仍可正常执行
+                print(f"  创建trace索引失败（不影响查询）: {e}")
+            self._db_conn = conn
+        return self._db_conn
+    
+    async def wait_for_command(self, shutdown_waiter: asyncio.Future, timeout: float):
+        """
+        等待新命令到达、退出信号或超时
+        
+        监听模式下命令文件一出现就会唤醒，没有待重试的命令文件时不设超时，
+        空闲时不会周期性唤醒；轮询模式下只能等到超时后再扫描目录
+        """
+        if self._observer is not None and not self._pending_commands:
+            timeout = None
+        command_waiter = asyncio.ensure_future(self._command_ready.wait())
+        try:
+            await asyncio.wait(
+                {shutdown_waiter, command_waiter},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            command_waiter.cancel()
+        self._command_ready.clear()
     
     def update_status(self, status: str):
         """更新环境状态"""
-        with open(self.status_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "status": status,
-                "timestamp": datetime.now().isoformat()
-            }, f, ensure_ascii=False, indent=2)
-    
-    def poll_command(self) -> Optional[Dict[str, Any]]:
-        """轮询获取待处理命令"""
-        if not os.path.exists(self.commands_dir):
-            return None
-        
-        # 获取命令文件（按时间排序）
+        write_file_atomic(self.status_file, _json_dumps({
+            "status": status,
+            "timestamp": timestamp()
+        }))
+    
+    def _scan_command_files(self) -> List[tuple]:
+        """扫描命令目录，返回按修改时间排序的 ((修改时间纳秒, 文件大小), 命令文件路径)"""
+        # 单次 scandir 同时取得文件名和 stat 信息，不需要先 exists 再逐个 getmtime
         command_files = []
-        for filename in os.listdir(self.commands_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.commands_dir, filename)
-                command_files.append((filepath, os.path.getmtime(filepath)))
+        try:
+            with os.scandir(self.commands_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json'):
+                        try:
+                            st = entry.stat()
+                            command_files.append(((st.st_mtime_ns, st.st_size), entry.path))
+                        except OSError:
+                            continue
+        except FileNotFoundError:
+            return []
         
-        command_files.sort(key=lambda x: x[1])
+        command_files.sort()
+        return command_files
+    
+    def poll_commands(self) -> List[Dict[str, Any]]:
+        """轮询获取所有待处理命令（按到达顺序）"""
+        commands = []
+        seen = self._seen_command_files
+        if self._observer is None:
+            # 轮询模式：目录修改时间未变时只需一次 stat，不再逐个扫描文件
+            try:
+                dir_stat = os.stat(self.commands_dir)
+            except OSError:
+                dir_stat = None
+            if dir_stat is not None and dir_stat.st_mtime_ns == self._commands_dir_mtime:
+                return commands
+            
+            # 按时间顺序读取所有未读过（或读过后又被改写）的命令文件
+            command_files = self._scan_command_files()
+            # 只有目录为空且修改时间已稳定时才记录：目录中还有文件时可能被原地重写
+            # （不改变目录修改时间），刚修改过的目录在时间戳精度内仍可能有新文件写入
+            dir_settled = (
+                dir_stat is not None and not command_files
+                and time.time() - dir_stat.st_mtime >= _COMMANDS_DIR_SETTLE_SECONDS
+            )
+            for signature, filepath in command_files:
+                if seen.get(filepath) == signature:
+                    continue
+                try:
+                    with open(filepath, 'rb') as f:
+                        commands.append(_json_loads(f.read()))
+                        # 解析成功后才记录，签名取自已读取的文件本身，不会因扫描后文件又被写入而错配
+                        st = os.fstat(f.fileno())
+                except json.JSONDecodeError as e:
+                    self._reject_command_file(filepath, e)
+                    continue
+                except OSError:
+                    # 文件已被处理或删除
+                    continue
+                seen[filepath] = (st.st_mtime_ns, st.st_size)
+            self._commands_dir_mtime = dir_stat.st_mtime_ns if dir_settled else None
+            # 只保留仍存在的文件，已删除的命令文件不再记录
+            if len(seen) > len(command_files):
+                current = {filepath for _, filepath in command_files}
+                for filepath in [path for path in seen if path not in current]:
+                    del seen[filepath]
+            return commands
         
-        for filepath, _ in command_files:
+        # 监听模式：只读取事件推送的命令文件，不再扫描整个目录
+        while self._pending_commands:
+            filepath = self._pop_command_file()
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, OSError):
+                with open(filepath, 'rb') as f:
+                    commands.append(_json_loads(f.read()))
+            except json.JSONDecodeError as e:
+                self._reject_command_file(filepath, e)
+            except OSError:
+                # 文件已被处理或删除
                 continue
         
-        return None
+        return commands
     
     def send_response(self, command_id: str, status: str, result: Dict = None, error: str = None):
         """发送响应"""
@@ -197,12 +476,12 @@ class IPCHandler:
             "status": status,
             "result": result,
             "error": error,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp()
         }
         
+        # 先完成序列化，再原子写入响应文件
         response_file = os.path.join(self.responses_dir, f"{command_id}.json")
-        with open(response_file, 'w', encoding='utf-8') as f:
-            json.dump(response, f, ensure_ascii=False, indent=2)
+        write_file_atomic(response_file, _json_dumps(response))
         
         # 删除命令文件
         command_file = os.path.join(self.commands_dir, f"{command_id}.json")
@@ -211,130 +490,116 @@ class IPCHandler:
         except OSError:
             pass
     
-    async def handle_interview(self, command_id: str, agent_id: int, prompt: str) -> bool:
+    def _prepare_interview(self, command: Dict[str, Any]) -> Optional[Dict[int, str]]:
         """
-        处理单个Agent采访命令
+        把采访命令解析为 {agent_id: prompt}
         
-        Returns:
-            True 表示成功，False 表示失败
+        Agent 无效时直接回写失败响应并返回 None
         """
-        try:
-            # 获取Agent
-            agent = self.agent_graph.get_agent(agent_id)
-            
-            # 创建Interview动作
-            interview_action = ManualAction(
-                action_type=ActionType.INTERVIEW,
-                action_args={"prompt": prompt}
-            )
-            
-            # 执行Interview
-            actions = {agent: interview_action}
-            await self.env.step(actions)
-            
-            # 从数据库获取结果
-            result = self._get_interview_result(agent_id)
+        command_id = command.get("command_id")
+        args = command.get("args", {})
+        
+        if command.get("command_type") == CommandType.INTERVIEW:
+            agent_id = args.get("agent_id", 0)
+            try:
+                self.agent_map[agent_id]
+            except Exception as e:
+                error_msg = str(e)
+                print(f"  Interview失败: agent_id={agent_id}, error={error_msg}")
+                self.send_response(command_id, "failed", error=error_msg)
+                return None
+            return {agent_id: args.get("prompt", "")}
             
-            self.send_response(command_id, "completed", result=result)
-            print(f"  Interview完成: agent_id={agent_id}")
-            return True
+        agent_prompts = {}  # 记录每个agent的prompt
+        for interview in args.get("interviews", []):
+            agent_id = interview.get("agent_id")
+            try:
+                self.agent_map[agent_id]
+            except Exception as e:
+                print(f"  警告: 无法获取Agent {agent_id}: {e}")
+                continue
+            agent_prompts[agent_id] = interview.get("prompt", "")
             
-        except Exception as e:
-            error_msg = str(e)
-            print(f"  Interview失败: agent_id={agent_id}, error={error_msg}")
-            self.send_response(command_id, "failed", error=error_msg)
-            return False
+        if not agent_prompts:
+            self.send_response(command_id, "failed", error="没有有效的Agent")
+            return None
+        return agent_prompts
     
-    async def handle_batch_interview(self, command_id: str, interviews: List[Dict]) -> bool:
+    async def handle_interviews(self, group: List[Tuple[Dict[str, Any], Dict[int, str]]]):
         """
-        处理批量采访命令
+        把多条采访命令合并为一次 env.step 执行，再按 command_id 分别回写结果
         
         Args:
-            interviews: [{"agent_id": int, "prompt": str}, ...]
+            group: [(command, {agent_id: prompt}), ...]，各命令的 agent_id 互不重复
         """
-        try:
-            # 构建动作字典
-            actions = {}
-            agent_prompts = {}  # 记录每个agent的prompt
-            
-            for interview in interviews:
-                agent_id = interview.get("agent_id")
-                prompt = interview.get("prompt", "")
+        # 动作类型和查找表在循环外取一次，批量采访数百个 Agent 时只剩构造 ManualAction 的开销
+        interview_type = ActionType.INTERVIEW
+        agent_map = self.agent_map
+        actions = {}
+        for _, agent_prompts in group:
+            for agent_id, prompt in agent_prompts.items():
+                actions[agent_map[agent_id]] = ManualAction(
+                    action_type=interview_type,
+                    action_args={"prompt": prompt}
+                )
                 
-                try:
-                    agent = self.agent_graph.get_agent(agent_id)
-                    actions[agent] = ManualAction(
-                        action_type=ActionType.INTERVIEW,
-                        action_args={"prompt": prompt}
-                    )
-                    agent_prompts[agent_id] = prompt
-                except Exception as e:
-                    print(f"  警告: 无法获取Agent {agent_id}: {e}")
-            
-            if not actions:
-                self.send_response(command_id, "failed", error="没有有效的Agent")
-                return False
-            
-            # 执行批量Interview
+        try:
+            # 执行合并后的Interview
             await self.env.step(actions)
-            
-            # 获取所有结果
-            results = {}
-            for agent_id in agent_prompts.keys():
-                result = self._get_interview_result(agent_id)
-                results[agent_id] = result
-            
-            self.send_response(command_id, "completed", result={
-                "interviews_count": len(results),
-                "results": results
-            })
-            print(f"  批量Interview完成: {len(results)} 个Agent")
-            return True
-            
         except Exception as e:
             error_msg = str(e)
-            print(f"  批量Interview失败: {error_msg}")
-            self.send_response(command_id, "failed", error=error_msg)
-            return False
+            for command, agent_prompts in group:
+                if command.get("command_type") == CommandType.INTERVIEW:
+                    print(f"  Interview失败: agent_id={next(iter(agent_prompts))}, error={error_msg}")
+                else:
+                    print(f"  批量Interview失败: {error_msg}")
+                self.send_response(command.get("command_id"), "failed", error=error_msg)
+            return
+            
+        # 从数据库获取结果，按命令分别回写
+        for command, agent_prompts in group:
+            command_id = command.get("command_id")
+            if command.get("command_type") == CommandType.INTERVIEW:
+                agent_id = next(iter(agent_prompts))
+                self.send_response(command_id, "completed", result=self._get_interview_result(agent_id))
+                print(f"  Interview完成: agent_id={agent_id}")
+            else:
+                results = {}
+                for agent_id in agent_prompts:
+                    results[agent_id] = self._get_interview_result(agent_id)
+                self.send_response(command_id, "completed", result={
+                    "interviews_count": len(results),
+                    "results": results
+                })
+                print(f"  批量Interview完成: {len(results)} 个Agent")
     
     def _get_interview_result(self, agent_id: int) -> Dict[str, Any]:
         """从数据库获取最新的Interview结果"""
-        db_path = os.path.join(self.simulation_dir, "reddit_simulation.db")
-        
         result = {
             "agent_id": agent_id,
             "response": None,
             "timestamp": None
         }
         
-        if not os.path.exists(db_path):
-            return result
-        
         try:
-            conn = sqlite3.connect(db_path)
+            conn = self._get_conn()
+            if conn is None:
+                return result
             cursor = conn.cursor()
             
             # 查询最新的Interview记录
-            cursor.execute("""
-                SELECT user_id, info, created_at
-                FROM trace
-                WHERE action = ? AND user_id = ?
-                ORDER BY created_at DESC
-                LIMIT 1
-            """, (ActionType.INTERVIEW.value, agent_id))
+            cursor.execute(_INTERVIEW_RESULT_SQL, (_INTERVIEW_ACTION, agent_id))
             
             row = cursor.fetchone()
             if row:
                 user_id, info_json, created_at = row
                 try:
-                    info = json.loads(info_json) if info_json else {}
+                    info = _json_loads(info_json) if info_json else {}
                     result["response"] = info.get("response", info)
                     result["timestamp"] = created_at
                 except json.JSONDecodeError:
                     result["response"] = info_json
             
-            conn.close()
-            
         except Exception as e:
             print(f"  读取Interview结果失败: {e}")
         
@@ -342,37 +607,55 @@ class IPCHandler:
     
     async def process_commands(self) -> bool:
         """
-        处理所有待处理命令
+        处理所有待处理命令（一次取出全部积压命令，按到达顺序依次执行）
+        
+        连续到达的采访命令合并为一次 env.step；同一 Agent 在一次 step 中只能有
+        一个动作，出现重复时先执行已合并的部分。
         
         Returns:
             True 表示继续运行，False 表示应该退出
         """
-        command = self.poll_command()
-        if not command:
-            return True
+        group = []  # 待合并执行的采访命令 [(command, {agent_id: prompt}), ...]
+        group_agents = set()
         
+        for command in self.poll_commands():
+            command_type = command.get("command_type")
+            if command_type in (CommandType.INTERVIEW, CommandType.BATCH_INTERVIEW):
+                print(f"\n收到IPC命令: {command_type}, id={command.get('command_id')}")
+                agent_prompts = self._prepare_interview(command)
+                if agent_prompts is None:
+                    continue
+                if not group_agents.isdisjoint(agent_prompts):
+                    await self.handle_interviews(group)
+                    group, group_agents = [], set()
+                group.append((command, agent_prompts))
+                group_agents.update(agent_prompts)
+                continue
+                
+            # 其他命令执行前先完成已合并的采访，保持到达顺序
+            if group:
+                await self.handle_interviews(group)
+                group, group_agents = [], set()
+            if not await self._dispatch_command(command):
+                return False
+                
+        if group:
+            await self.handle_interviews(group)
+        return True
+    
+    async def _dispatch_command(self, command: Dict[str, Any]) -> bool:
+        """
+        执行单条非采访命令
+        
+        Returns:
+            True 表示继续运行，False 表示应该退出
+        """
         command_id = command.get("command_id")
         command_type = command.get("command_type")
-        args = command.get("args", {})
         
         print(f"\n收到IPC命令: {command_type}, id={command_id}")
         
-        if command_type == CommandType.INTERVIEW:
-            await self.handle_interview(
-                command_id,
-                args.get("agent_id", 0),
-                args.get("prompt", "")
-            )
-            return True
-            
-        elif command_type == CommandType.BATCH_INTERVIEW:
-            await self.handle_batch_interview(
-                command_id,
-                args.get("interviews", [])
-            )
-            return True
-            
-        elif command_type == CommandType.CLOSE_ENV:
+        if command_type == CommandType.CLOSE_ENV:
             print("收到关闭环境命令")
             self.send_response(command_id, "completed", result={"message": "环境即将关闭"})
             return False
@@ -382,6 +665,21 @@ class IPCHandler:
             return True
 
 
+def _build_round_clock(total_rounds: int, minutes_per_round: int) -> Tuple[List[int], List[int]]:
+    """
+    一次性计算每一轮对应的模拟小时和模拟天数
+    
+    Returns:
+        (hours, days)，按轮次下标索引
+    """
+    if np is not None:
+        minutes = np.arange(total_rounds, dtype=np.int64) * minutes_per_round
+        return ((minutes // 60) % 24).tolist(), (minutes // (60 * 24) + 1).tolist()
+    
+    minutes = [round_num * minutes_per_round for round_num in range(total_rounds)]
+    return [(m // 60) % 24 for m in minutes], [m // (60 * 24) + 1 for m in minutes]
+
+
 class RedditSimulationRunner:
     """Reddit模拟运行器"""
     
@@ -417,11 +715,17 @@ class RedditSimulationRunner:
         self.env = None
         self.agent_graph = None
         self.ipc_handler = None
+        # agent_id -> agent 映射，Agent 图生成后构建一次
+        self._agent_map: Dict[int, Any] = {}
+        # Agent 激活抽样使用运行器自己的随机数生成器（配置了 seed 时结果可复现）
+        seed = self.config.get("seed")
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed) if np is not None else None
         
     def _load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(self.config_path, 'rb') as f:
+            return _json_loads(f.read())
     
     def _get_profile_path(self) -> str:
         """获取Profile文件路径"""
@@ -475,50 +779,38 @@ class RedditSimulationRunner:
         """
         根据时间和配置决定本轮激活哪些Agent
         """
-        time_config = self.config.get("time_config", {})
-        agent_configs = self.config.get("agent_configs", [])
+        selected_ids = sample_active_agent_ids(self.config, current_hour, self._rng, self._np_rng)
         
-        base_min = time_config.get("agents_per_hour_min", 5)
-        base_max = time_config.get("agents_per_hour_max", 20)
-        
-        peak_hours = time_config.get("peak_hours", [9, 10, 11, 14, 15, 20, 21, 22])
-        off_peak_hours = time_config.get("off_peak_hours", [0, 1, 2, 3, 4, 5])
-        
-        if current_hour in peak_hours:
-            multiplier = time_config.get("peak_activity_multiplier", 1.5)
-        elif current_hour in off_peak_hours:
-            multiplier = time_config.get("off_peak_activity_multiplier", 0.3)
-        else:
-            multiplier = 1.0
-        
-        target_count = int(random.uniform(base_min, base_max) * multiplier)
+        agent_map = self._agent_map
+        return [(agent_id, agent_map[agent_id]) for agent_id in selected_ids if agent_id in agent_map]
+    
+    async def _produce_rounds(self, round_queue: asyncio.Queue, total_rounds: int, minutes_per_round: int):
+        """
+        依次计算每一轮的模拟时间、激活 Agent 和动作并放入队列
         
-        candidates = []
-        for cfg in agent_configs:
-            agent_id = cfg.get("agent_id", 0)
-            active_hours = cfg.get("active_hours", list(range(8, 23)))
-            activity_level = cfg.get("activity_level", 0.5)
-            
-            if current_hour not in active_hours:
-                continue
+        队列容量为 1：主循环等待当前轮 env.step 时，这里提前准备好下一轮。
+        出错时把异常放入队列，由主循环抛出
+        """
+        try:
+            # 各轮的模拟时间预先算好，循环内只做下标访问
+            hours, days = _build_round_clock(total_rounds, minutes_per_round)
             
-            if random.random() < activity_level:
-                candidates.append(agent_id)
-        
-        selected_ids = random.sample(
-            candidates, 
-            min(target_count, len(candidates))
-        ) if candidates else []
-        
-        active_agents = []
-        for agent_id in selected_ids:
-            try:
-                agent = env.agent_graph.get_agent(agent_id)
-                active_agents.append((agent_id, agent))
-            except Exception:
-                pass
-        
-        return active_agents
+            for round_num in range(total_rounds):
+                simulated_hour = hours[round_num]
+                simulated_day = days[round_num]
+                
+                # 获取本轮激活的Agent并构建动作
+                active_agents = self._get_active_agents_for_round(
+                    self.env, simulated_hour, round_num
+                )
+                actions = {
+                    agent: LLMAction()
+                    for _, agent in active_agents
+                }
+                
+                await round_queue.put((round_num, simulated_hour, simulated_day, active_agents, actions))
+        except Exception as e:
+            await round_queue.put(e)
     
     async def run(self, max_rounds: int = None):
         """运行Reddit模拟
@@ -567,6 +859,7 @@ class RedditSimulationRunner:
             model=model,
             available_actions=self.AVAILABLE_ACTIONS,
         )
+        self._agent_map = dict(self.agent_graph.get_agents())
         
         db_path = self._get_db_path()
         if os.path.exists(db_path):
@@ -585,7 +878,7 @@ class RedditSimulationRunner:
         print("环境初始化完成\n")
         
         # 初始化IPC处理器
-        self.ipc_handler = IPCHandler(self.simulation_dir, self.env, self.agent_graph)
+        self.ipc_handler = IPCHandler(self.simulation_dir, self.env, self.agent_graph, self._agent_map)
         self.ipc_handler.update_status("running")
         
         # 执行初始事件
@@ -594,24 +887,17 @@ class RedditSimulationRunner:
         
         if initial_posts:
             print(f"执行初始事件 ({len(initial_posts)}条初始帖子)...")
-            initial_actions = {}
+            # 同一 Agent 的多条初始帖子合并为动作列表，一次 step 全部执行
+            initial_actions = defaultdict(list)
             for post in initial_posts:
                 agent_id = post.get("poster_agent_id", 0)
                 content = post.get("content", "")
                 try:
-                    agent = self.env.agent_graph.get_agent(agent_id)
-                    if agent in initial_actions:
-                        if not isinstance(initial_actions[agent], list):
-                            initial_actions[agent] = [initial_actions[agent]]
-                        initial_actions[agent].append(ManualAction(
-                            action_type=ActionType.CREATE_POST,
-                            action_args={"content": content}
-                        ))
-                    else:
-                        initial_actions[agent] = ManualAction(
-                            action_type=ActionType.CREATE_POST,
-                            action_args={"content": content}
-                        )
+                    agent = self._agent_map[agent_id]
+                    initial_actions[agent].append(ManualAction(
+                        action_type=ActionType.CREATE_POST,
+                        action_args={"content": content}
+                    ))
                 except Exception as e:
                     print(f"  警告: 无法为Agent {agent_id}创建初始帖子: {e}")
             
@@ -623,34 +909,40 @@ class RedditSimulationRunner:
         print("\n开始模拟循环...")
         start_time = datetime.now()
         
-        for round_num in range(total_rounds):
-            simulated_minutes = round_num * minutes_per_round
-            simulated_hour = (simulated_minutes // 60) % 24
-            simulated_day = simulated_minutes // (60 * 24) + 1
-            
-            active_agents = self._get_active_agents_for_round(
-                self.env, simulated_hour, round_num
-            )
-            
-            if not active_agents:
-                continue
-            
-            actions = {
-                agent: LLMAction()
-                for _, agent in active_agents
-            }
-            
-            await self.env.step(actions)
-            
-            if (round_num + 1) % 10 == 0 or round_num == 0:
-                elapsed = (datetime.now() - start_time).total_seconds()
-                progress = (round_num + 1) / total_rounds * 100
-                print(f"  [Day {simulated_day}, {simulated_hour:02d}:00] "
-                      f"Round {round_num + 1}/{total_rounds} ({progress:.1f}%) "
-                      f"- {len(active_agents)} agents active "
-                      f"- elapsed: {elapsed:.1f}s")
+        # 后台预先计算后续轮次的激活 Agent 和动作，与当前轮 env.step 的 LLM 等待重叠
+        round_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        producer = asyncio.ensure_future(
+            self._produce_rounds(round_queue, total_rounds, minutes_per_round)
+        )
+        
+        try:
+            for _ in range(total_rounds):
+                item = await round_queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                round_num, simulated_hour, simulated_day, active_agents, actions = item
+                
+                if not active_agents:
+                    continue
+                
+                # 执行动作
+                await self.env.step(actions)
+                # 每轮结束写出本轮日志，运行期间日志文件不会长时间停留在旧内容
+                flush_oasis_logging()
+                
+                # 打印进度
+                if (round_num + 1) % 10 == 0 or round_num == 0:
+                    elapsed = (datetime.now() - start_time).total_seconds()
+                    progress = (round_num + 1) / total_rounds * 100
+                    print(f"  [Day {simulated_day}, {simulated_hour:02d}:00] "
+                          f"Round {round_num + 1}/{total_rounds} ({progress:.1f}%) "
+                          f"- {len(active_agents)} agents active "
+                          f"- elapsed: {elapsed:.1f}s")
+        finally:
+            producer.cancel()
         
         total_elapsed = (datetime.now() - start_time).total_seconds()
+        flush_oasis_logging()
         print(f"\n模拟循环完成!")
         print(f"  - 总耗时: {total_elapsed:.1f}秒")
         print(f"  - 数据库: {db_path}")
@@ -665,28 +957,31 @@ class RedditSimulationRunner:
             self.ipc_handler.update_status("alive")
             
             # 等待命令循环（使用全局 _shutdown_event）
+            shutdown_waiter = asyncio.ensure_future(_shutdown_event.wait())
             try:
                 while not _shutdown_event.is_set():
                     should_continue = await self.ipc_handler.process_commands()
+                    flush_oasis_logging()
                     if not should_continue:
                         break
-                    try:
-                        await asyncio.wait_for(_shutdown_event.wait(), timeout=0.5)
-                        break  # 收到退出信号
-                    except asyncio.TimeoutError:
-                        pass
+                    # 新命令到达或收到退出信号时立即唤醒；轮询模式下 0.5 秒后再次扫描
+                    await self.ipc_handler.wait_for_command(shutdown_waiter, timeout=0.5)
             except KeyboardInterrupt:
                 print("\n收到中断信号")
             except asyncio.CancelledError:
                 print("\n任务被取消")
             except Exception as e:
                 print(f"\n命令处理出错: {e}")
+            finally:
+                shutdown_waiter.cancel()
             
             print("\n关闭环境...")
         
         # 关闭环境
+        self.ipc_handler.close()
         self.ipc_handler.update_status("stopped")
         await self.env.close()
+        flush_oasis_logging()
         
         print("环境已关闭")
         print("=" * 60)
@@ -718,6 +1013,7 @@ async def main():
     # 在 main 函数开始时创建 shutdown 事件
     global _shutdown_event
     _shutdown_event = asyncio.Event()
+    _install_loop_signal_handlers()
     
     if not os.path.exists(args.config):
         print(f"错误: 配置文件不存在: {args.config}")
@@ -734,23 +1030,46 @@ async def main():
     await runner.run(max_rounds=args.max_rounds)
 
 
+def _request_shutdown(signum: int):
+    """
+    处理 SIGTERM/SIGINT：第一次收到时通知事件循环退出等待，
+    让程序有机会正常清理资源（关闭数据库、环境等）；重复收到才强制退出
+    """
+    global _cleanup_done
+    sig_name = "SIGTERM" if signum == signal.SIGTERM else "SIGINT"
+    print(f"\n收到 {sig_name} 信号，正在退出...")
+    if not _cleanup_done:
+        _cleanup_done = True
+        if _shutdown_event:
+            _shutdown_event.set()
+    else:
+        # 重复收到信号才强制退出
+        print("强制退出...")
+        sys.exit(1)
+
+
+def _install_loop_signal_handlers():
+    """
+    改由事件循环处理 SIGTERM/SIGINT
+    
+    回调在事件循环中执行，信号到达时立即唤醒正在等待的循环，
+    不再在任意字节码之间打断主线程；不支持 add_signal_handler 的平台（Windows）
+    继续使用 setup_signal_handlers 注册的处理器
+    """
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, _request_shutdown, signum)
+        except (NotImplementedError, RuntimeError):
+            return
+
+
 def setup_signal_handlers():
     """
-    设置信号处理器，确保收到 SIGTERM/SIGINT 时能够正确退出
-    让程序有机会正常清理资源（关闭数据库、环境等）
+    设置信号处理器，确保事件循环启动前收到 SIGTERM/SIGINT 时也能够正确退出
     """
     def signal_handler(signum, frame):
-        global _cleanup_done
-        sig_name = "SIGTERM" if signum == signal.SIGTERM else "SIGINT"
-        print(f"\n收到 {sig_name} 信号，正在退出...")
-        if not _cleanup_done:
-            _cleanup_done = True
-            if _shutdown_event:
-                _shutdown_event.set()
-        else:
-            # 重复收到信号才强制退出
-            print("强制退出...")
-            sys.exit(1)
+        _request_shutdown(signum)
     
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
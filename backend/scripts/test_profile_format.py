@@ -3,28 +3,35 @@
 验证：
 1. Twitter Profile生成CSV格式
 2. Reddit Profile生成JSON详细格式
+3. Reddit Profile生成JSONL格式（与JSON内容一致）
 """
 
 import os
 import sys
 import json
-import csv
-import tempfile
 
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.oasis_profile_generator import OasisProfileGenerator, OasisAgentProfile
+from app.services.oasis_profile_generator import (
+    OasisAgentProfile,
+    save_reddit_json,
+    save_reddit_jsonl,
+    save_twitter_csv,
+)
 
+# 各格式需要检查的字段（模块加载时构建一次）
+_REQUIRED_TWITTER_FIELDS = frozenset({
+    'user_id', 'user_name', 'name', 'bio',
+    'friend_count', 'follower_count', 'statuses_count', 'created_at',
+})
+_REQUIRED_REDDIT_FIELDS = frozenset({'realname', 'username', 'bio', 'persona'})
+_OPTIONAL_REDDIT_FIELDS = frozenset({'age', 'gender', 'mbti', 'country', 'profession', 'interested_topics'})
 
-def test_profile_formats():
-    """测试Profile格式"""
-    print("=" * 60)
-    print("OASIS Profile格式测试")
-    print("=" * 60)
-    
-    # 创建测试Profile数据
-    test_profiles = [
+
+def _build_test_profiles():
+    """创建测试Profile数据"""
+    return [
         OasisAgentProfile(
             user_id=0,
             user_name="test_user_123",
@@ -60,67 +67,121 @@ def test_profile_formats():
             source_entity_type="University",
         ),
     ]
+
+
+def _write_profile_files(temp_dir: str) -> dict:
+    """
+    把测试Profile一次性写出为各平台格式，后续各项检查共用这些文件
+    
+    Returns:
+        {"twitter": CSV路径, "reddit": JSON路径, "reddit_jsonl": JSONL路径}
+    """
+    test_profiles = _build_test_profiles()
+    
+    paths = {
+        "twitter": os.path.join(temp_dir, "twitter_profiles.csv"),
+        "reddit": os.path.join(temp_dir, "reddit_profiles.json"),
+        "reddit_jsonl": os.path.join(temp_dir, "reddit_profiles.jsonl"),
+    }
+    save_twitter_csv(test_profiles, paths["twitter"])
+    save_reddit_json(test_profiles, paths["reddit"])
+    save_reddit_jsonl(test_profiles, paths["reddit_jsonl"])
+    return paths
+
+
+def _check_twitter_csv(twitter_path: str):
+    """检查Twitter CSV格式"""
+    import csv
+    
+    print("\n1. 测试Twitter Profile (CSV格式)")
+    print("-" * 40)
+    
+    # 读取并验证CSV：按记录解析（带引号的字段可能包含换行符，一条记录不一定只占一行）
+    with open(twitter_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        first_row = next(reader, None)
+        row_count = (first_row is not None) + sum(1 for _ in reader)
+    
+    print(f"   文件: {twitter_path}")
+    print(f"   行数: {row_count}")
+    print(f"   表头: {header}")
+    print("\n   示例数据 (第1行):")
+    for key, value in zip(header, first_row or ()):
+        print(f"     {key}: {value}")
+    
+    # 验证必需字段
+    missing = _REQUIRED_TWITTER_FIELDS.difference(header)
+    if missing:
+        print(f"\n   [错误] 缺少字段: {set(missing)}")
+    else:
+        print("\n   [通过] 所有必需字段都存在")
+
+
+def _check_reddit_json(reddit_path: str) -> list:
+    """检查Reddit JSON详细格式，返回读取到的数据供后续比对"""
+    print("\n2. 测试Reddit Profile (JSON详细格式)")
+    print("-" * 40)
+    
+    # 读取并验证JSON
+    with open(reddit_path, 'r', encoding='utf-8') as f:
+        reddit_data = json.load(f)
+    
+    print(f"   文件: {reddit_path}")
+    print(f"   条目数: {len(reddit_data)}")
+    print(f"   字段: {list(reddit_data[0].keys())}")
+    print("\n   示例数据 (第1条):")
+    print(json.dumps(reddit_data[0], ensure_ascii=False, indent=4))
     
-    generator = OasisProfileGenerator.__new__(OasisProfileGenerator)
+    # 验证详细格式字段（dict_keys 直接参与集合运算，不再构建临时集合）
+    missing = _REQUIRED_REDDIT_FIELDS - reddit_data[0].keys()
+    if missing:
+        print(f"\n   [错误] 缺少必需字段: {missing}")
+    else:
+        print("\n   [通过] 所有必需字段都存在")
+    
+    present_optional = _OPTIONAL_REDDIT_FIELDS & reddit_data[0].keys()
+    print(f"   [信息] 可选字段: {present_optional}")
+    return reddit_data
+
+
+def _check_reddit_jsonl(reddit_jsonl_path: str, reddit_data: list):
+    """检查Reddit JSONL格式（逐行解析，大批量Profile校验时不需要一次载入整个文件）"""
+    print("\n3. 测试Reddit Profile (JSONL格式)")
+    print("-" * 40)
+    
+    jsonl_count = 0
+    jsonl_matched = 0
+    with open(reddit_jsonl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if jsonl_count < len(reddit_data) and record == reddit_data[jsonl_count]:
+                jsonl_matched += 1
+            jsonl_count += 1
+    
+    print(f"   文件: {reddit_jsonl_path}")
+    print(f"   条目数: {jsonl_count}")
+    if jsonl_count == jsonl_matched == len(reddit_data):
+        print("\n   [通过] 与JSON格式内容一致")
+    else:
+        print(f"\n   [错误] 与JSON格式内容不一致（一致条目: {jsonl_matched}）")
+
+
+def test_profile_formats():
+    """测试Profile格式（各格式文件只写一次，所有检查共用）"""
+    import tempfile
+    
+    print("=" * 60)
+    print("OASIS Profile格式测试")
+    print("=" * 60)
     
     # 使用临时目录
     with tempfile.TemporaryDirectory() as temp_dir:
-        twitter_path = os.path.join(temp_dir, "twitter_profiles.csv")
-        reddit_path = os.path.join(temp_dir, "reddit_profiles.json")
-        
-        # 测试Twitter CSV格式
-        print("\n1. 测试Twitter Profile (CSV格式)")
-        print("-" * 40)
-        generator._save_twitter_csv(test_profiles, twitter_path)
-        
-        # 读取并验证CSV
-        with open(twitter_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-            
-        print(f"   文件: {twitter_path}")
-        print(f"   行数: {len(rows)}")
-        print(f"   表头: {list(rows[0].keys())}")
-        print(f"\n   示例数据 (第1行):")
-        for key, value in rows[0].items():
-            print(f"     {key}: {value}")
-        
-        # 验证必需字段
-        required_twitter_fields = ['user_id', 'user_name', 'name', 'bio', 
-                                   'friend_count', 'follower_count', 'statuses_count', 'created_at']
-        missing = set(required_twitter_fields) - set(rows[0].keys())
-        if missing:
-            print(f"\n   [错误] 缺少字段: {missing}")
-        else:
-            print(f"\n   [通过] 所有必需字段都存在")
-        
-        # 测试Reddit JSON格式
-        print("\n2. 测试Reddit Profile (JSON详细格式)")
-        print("-" * 40)
-        generator._save_reddit_json(test_profiles, reddit_path)
-        
-        # 读取并验证JSON
-        with open(reddit_path, 'r', encoding='utf-8') as f:
-            reddit_data = json.load(f)
-        
-        print(f"   文件: {reddit_path}")
-        print(f"   条目数: {len(reddit_data)}")
-        print(f"   字段: {list(reddit_data[0].keys())}")
-        print(f"\n   示例数据 (第1条):")
-        print(json.dumps(reddit_data[0], ensure_ascii=False, indent=4))
-        
-        # 验证详细格式字段
-        required_reddit_fields = ['realname', 'username', 'bio', 'persona']
-        optional_reddit_fields = ['age', 'gender', 'mbti', 'country', 'profession', 'interested_topics']
-        
-        missing = set(required_reddit_fields) - set(reddit_data[0].keys())
-        if missing:
-            print(f"\n   [错误] 缺少必需字段: {missing}")
-        else:
-            print(f"\n   [通过] 所有必需字段都存在")
+        paths = _write_profile_files(temp_dir)
         
-        present_optional = set(optional_reddit_fields) & set(reddit_data[0].keys())
-        print(f"   [信息] 可选字段: {present_optional}")
+        _check_twitter_csv(paths["twitter"])
+        reddit_data = _check_reddit_json(paths["reddit"])
+        _check_reddit_jsonl(paths["reddit_jsonl"], reddit_data)
     
     print("\n" + "=" * 60)
     print("测试完成!")